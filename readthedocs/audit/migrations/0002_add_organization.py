@@ -1,30 +1,113 @@
 # Generated by Django 2.2.24 on 2021-09-14 20:53
 
 from django.db import migrations, models
-import django.db.models.deletion
+
+from readthedocs.core.utils.migrations import RunSQLPostgres
 
 
 class Migration(migrations.Migration):
 
+    """
+    Add the organization fields to the audit log.
+
+    Only the columns are added here, adding nullable columns without a default
+    is a metadata only change, so this migration doesn't need to rewrite the table.
+    All columns are added in a single ``ALTER TABLE`` statement,
+    so the lock on the table is acquired only once.
+    Indexes are created concurrently in ``0009_add_organization_indexes``.
+
+    ``organization_id`` is created as ``bigint``, so the table doesn't need to be rewritten
+    if ``Organization`` is migrated to use ``BigAutoField``.
+
+    The foreign key constraint is added as ``NOT VALID`` and validated in a separate step,
+    validating only takes a ``SHARE UPDATE EXCLUSIVE`` lock,
+    so reads and writes aren't blocked while the table is scanned.
+
+    .. note::
+
+       ``CREATE INDEX CONCURRENTLY`` is PostgreSQL only.
+       If we ever need to do this on a database that doesn't support it (like MySQL),
+       the alternative is to swap tables: copy the existing rows into a new table
+       (``auditlog_copy``), build the indexes there, stop the writers,
+       copy the rows that were created in the meantime,
+       and rename both tables in a single ``RENAME TABLE`` statement.
+    """
+
+    # Each statement is committed on its own,
+    # so the foreign key constraint is added and validated in different transactions.
+    # All statements are idempotent, if the migration fails
+    # (e.g. the validation times out) it can be re-run without undoing the previous steps.
+    atomic = False
+
     dependencies = [
         ('organizations', '0006_add_assets_cleaned'),
         ('audit', '0001_initial'),
     ]
 
     operations = [
-        migrations.AddField(
-            model_name='auditlog',
-            name='log_organization_id',
-            field=models.IntegerField(blank=True, db_index=True, null=True, verbose_name='Organization ID'),
-        ),
-        migrations.AddField(
-            model_name='auditlog',
-            name='log_organization_slug',
-            field=models.CharField(blank=True, db_index=True, max_length=255, null=True, verbose_name='Organization slug'),
-        ),
-        migrations.AddField(
-            model_name='auditlog',
-            name='organization',
-            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='organizations.Organization', verbose_name='Organization'),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddField(
+                    model_name='auditlog',
+                    name='log_organization_id',
+                    field=models.IntegerField(blank=True, null=True, verbose_name='Organization ID'),
+                ),
+                migrations.AddField(
+                    model_name='auditlog',
+                    name='log_organization_slug',
+                    field=models.CharField(blank=True, max_length=255, null=True, verbose_name='Organization slug'),
+                ),
+                migrations.AddField(
+                    model_name='auditlog',
+                    name='organization',
+                    field=models.ForeignKey(db_index=False, null=True, on_delete=models.SET_NULL, to='organizations.Organization', verbose_name='Organization'),
+                ),
+            ],
+            database_operations=[
+                RunSQLPostgres(
+                    sql=[
+                        (
+                            'ALTER TABLE audit_auditlog '
+                            'ADD COLUMN IF NOT EXISTS log_organization_id integer NULL, '
+                            'ADD COLUMN IF NOT EXISTS log_organization_slug varchar(255) NULL, '
+                            'ADD COLUMN IF NOT EXISTS organization_id bigint NULL;'
+                        ),
+                        """
+                        DO $$ BEGIN
+                            ALTER TABLE audit_auditlog ADD CONSTRAINT audit_auditlog_organization_id_fk FOREIGN KEY (organization_id) REFERENCES organizations_organization (id) DEFERRABLE INITIALLY DEFERRED NOT VALID;
+                        EXCEPTION
+                            WHEN duplicate_object THEN NULL;
+                        END $$;
+                        """,
+                        'ALTER TABLE audit_auditlog VALIDATE CONSTRAINT audit_auditlog_organization_id_fk;',
+                    ],
+                    reverse_sql=[
+                        'ALTER TABLE audit_auditlog DROP CONSTRAINT IF EXISTS audit_auditlog_organization_id_fk;',
+                        (
+                            'ALTER TABLE audit_auditlog '
+                            'DROP COLUMN IF EXISTS log_organization_id, '
+                            'DROP COLUMN IF EXISTS log_organization_slug, '
+                            'DROP COLUMN IF EXISTS organization_id;'
+                        ),
+                    ],
+                    fallback=[
+                        migrations.AddField(
+                            model_name='auditlog',
+                            name='log_organization_id',
+                            field=models.IntegerField(blank=True, null=True, verbose_name='Organization ID'),
+                        ),
+                        migrations.AddField(
+                            model_name='auditlog',
+                            name='log_organization_slug',
+                            field=models.CharField(blank=True, max_length=255, null=True, verbose_name='Organization slug'),
+                        ),
+                        migrations.AddField(
+                            model_name='auditlog',
+                            name='organization',
+                            field=models.ForeignKey(db_index=False, null=True, on_delete=models.SET_NULL, to='organizations.Organization', verbose_name='Organization'),
+                        ),
+                    ],
+                ),
+            ],
         ),
     ]
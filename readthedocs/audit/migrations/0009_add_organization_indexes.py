@@ -0,0 +1,77 @@
+from django.db import migrations, models
+
+from readthedocs.core.utils.migrations import RunSQLPostgres
+
+
+class Migration(migrations.Migration):
+
+    """
+    Create the indexes for the organization fields of the audit log.
+
+    Indexes are created concurrently, so writes to the table aren't blocked.
+    Index names match the ones generated by Django,
+    so this is a no-op on databases where ``0002_add_organization``
+    already created them.
+    """
+
+    # CREATE INDEX CONCURRENTLY can't be run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('audit', '0008_alter_auditlog_action'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='auditlog',
+                    name='log_organization_id',
+                    field=models.IntegerField(blank=True, db_index=True, null=True, verbose_name='Organization ID'),
+                ),
+                migrations.AlterField(
+                    model_name='auditlog',
+                    name='log_organization_slug',
+                    field=models.CharField(blank=True, db_index=True, max_length=255, null=True, verbose_name='Organization slug'),
+                ),
+                migrations.AlterField(
+                    model_name='auditlog',
+                    name='organization',
+                    field=models.ForeignKey(null=True, on_delete=models.SET_NULL, to='organizations.Organization', verbose_name='Organization'),
+                ),
+            ],
+            database_operations=[
+                RunSQLPostgres(
+                    sql=[
+                        'CREATE INDEX CONCURRENTLY IF NOT EXISTS audit_auditlog_log_organization_id_77c5a860 ON audit_auditlog (log_organization_id);',
+                        'CREATE INDEX CONCURRENTLY IF NOT EXISTS audit_auditlog_log_organization_slug_58c9c7a5 ON audit_auditlog (log_organization_slug);',
+                        'CREATE INDEX CONCURRENTLY IF NOT EXISTS audit_auditlog_log_organization_slug_58c9c7a5_like ON audit_auditlog (log_organization_slug varchar_pattern_ops);',
+                        'CREATE INDEX CONCURRENTLY IF NOT EXISTS audit_auditlog_organization_id_991bcef6 ON audit_auditlog (organization_id);',
+                    ],
+                    reverse_sql=[
+                        'DROP INDEX CONCURRENTLY IF EXISTS audit_auditlog_log_organization_id_77c5a860;',
+                        'DROP INDEX CONCURRENTLY IF EXISTS audit_auditlog_log_organization_slug_58c9c7a5;',
+                        'DROP INDEX CONCURRENTLY IF EXISTS audit_auditlog_log_organization_slug_58c9c7a5_like;',
+                        'DROP INDEX CONCURRENTLY IF EXISTS audit_auditlog_organization_id_991bcef6;',
+                    ],
+                    fallback=[
+                        migrations.AlterField(
+                            model_name='auditlog',
+                            name='log_organization_id',
+                            field=models.IntegerField(blank=True, db_index=True, null=True, verbose_name='Organization ID'),
+                        ),
+                        migrations.AlterField(
+                            model_name='auditlog',
+                            name='log_organization_slug',
+                            field=models.CharField(blank=True, db_index=True, max_length=255, null=True, verbose_name='Organization slug'),
+                        ),
+                        migrations.AlterField(
+                            model_name='auditlog',
+                            name='organization',
+                            field=models.ForeignKey(null=True, on_delete=models.SET_NULL, to='organizations.Organization', verbose_name='Organization'),
+                        ),
+                    ],
+                ),
+            ],
+        ),
+    ]
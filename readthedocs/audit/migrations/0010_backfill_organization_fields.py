@@ -0,0 +1,114 @@
+from django.db import migrations
+
+# Number of rows fetched and updated on each batch.
+BATCH_SIZE = 30000
+# Number of rows updated on each query.
+UPDATE_BATCH_SIZE = 5000
+# Size of the primary key range updated on each query on PostgreSQL.
+PK_RANGE_SIZE = 10000
+
+MISSING_ORGANIZATION_FIELDS_SQL = """
+    SELECT EXISTS (
+        SELECT 1 FROM audit_auditlog
+        WHERE organization_id IS NOT NULL
+        AND log_organization_id IS NULL
+    );
+"""
+
+UPDATE_PK_RANGE_SQL = """
+    UPDATE audit_auditlog
+    SET log_organization_id = o.id, log_organization_slug = o.slug
+    FROM organizations_organization o
+    WHERE audit_auditlog.organization_id = o.id
+    AND audit_auditlog.log_organization_id IS NULL
+    AND audit_auditlog.id >= %s
+    AND audit_auditlog.id < %s;
+"""
+
+
+def forwards_func_postgres(schema_editor):
+    """
+    Populate the organization fields with an ``UPDATE`` per range of primary keys.
+
+    Rows don't need to go through Python,
+    and since the migration isn't atomic, each range is committed on its own,
+    so we don't lock the whole table in a single transaction.
+
+    ``AuditLog.save`` already fills these fields when ``organization`` is set,
+    so only rows written outside of it (e.g. with ``update()``) need to be fixed,
+    if there are none we skip scanning the table.
+    """
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(MISSING_ORGANIZATION_FIELDS_SQL)
+        if not cursor.fetchone()[0]:
+            return
+        cursor.execute("SELECT MIN(id), MAX(id) FROM audit_auditlog;")
+        min_id, max_id = cursor.fetchone()
+        if min_id is None:
+            return
+        for start in range(min_id, max_id + 1, PK_RANGE_SIZE):
+            cursor.execute(UPDATE_PK_RANGE_SQL, [start, start + PK_RANGE_SIZE])
+
+
+def forwards_func(apps, schema_editor):
+    """
+    Populate ``log_organization_id`` and ``log_organization_slug`` from ``organization``.
+
+    Only the primary key and organization ID of each row are fetched,
+    rows are paginated by primary key (keyset pagination),
+    and each page is updated with ``bulk_update`` after it's fully fetched,
+    so we don't do a query per row, load the whole table in memory,
+    or write to the table while iterating over it.
+
+    On PostgreSQL the rows are updated directly in SQL, see ``forwards_func_postgres``.
+    """
+    if schema_editor.connection.vendor == "postgresql":
+        forwards_func_postgres(schema_editor)
+        return
+
+    AuditLog = apps.get_model("audit", "AuditLog")
+    Organization = apps.get_model("organizations", "Organization")
+
+    organization_slugs = dict(Organization.objects.values_list("id", "slug"))
+    last_pk = 0
+    while True:
+        rows = list(
+            AuditLog.objects.filter(
+                pk__gt=last_pk,
+                organization_id__isnull=False,
+                log_organization_id__isnull=True,
+            )
+            .order_by("pk")
+            .values_list("pk", "organization_id")[:BATCH_SIZE]
+        )
+        if not rows:
+            break
+
+        AuditLog.objects.bulk_update(
+            [
+                AuditLog(
+                    pk=pk,
+                    log_organization_id=organization_id,
+                    log_organization_slug=organization_slugs.get(organization_id),
+                )
+                for pk, organization_id in rows
+            ],
+            ["log_organization_id", "log_organization_slug"],
+            batch_size=UPDATE_BATCH_SIZE,
+        )
+        last_pk = rows[-1][0]
+
+
+class Migration(migrations.Migration):
+
+    # Commit each batch, so we don't hold a single transaction over the whole table.
+    atomic = False
+
+    dependencies = [
+        ("audit", "0009_add_organization_indexes"),
+        ("organizations", "0006_add_assets_cleaned"),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards_func, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,94 @@
+from django.db import migrations, models
+
+from readthedocs.core.utils.migrations import RunSQLPostgres
+
+
+class Migration(migrations.Migration):
+
+    """
+    Replace the organization indexes with a single composite index.
+
+    Organization logs are always filtered by organization, action, and date,
+    a single index over those columns serves those queries,
+    and we avoid maintaining two extra indexes on a table with lots of writes.
+    """
+
+    # CREATE/DROP INDEX CONCURRENTLY can't be run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ("audit", "0010_backfill_organization_fields"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name="auditlog",
+                    name="log_organization_id",
+                    field=models.IntegerField(
+                        blank=True, null=True, verbose_name="Organization ID"
+                    ),
+                ),
+                migrations.AlterField(
+                    model_name="auditlog",
+                    name="log_organization_slug",
+                    field=models.CharField(
+                        blank=True,
+                        max_length=255,
+                        null=True,
+                        verbose_name="Organization slug",
+                    ),
+                ),
+                migrations.AddIndex(
+                    model_name="auditlog",
+                    index=models.Index(
+                        fields=["log_organization_id", "action", "-created"],
+                        name="audit_org_action_created_idx",
+                    ),
+                ),
+            ],
+            database_operations=[
+                RunSQLPostgres(
+                    sql=[
+                        "CREATE INDEX CONCURRENTLY IF NOT EXISTS audit_org_action_created_idx ON audit_auditlog (log_organization_id, action, created DESC);",
+                        "DROP INDEX CONCURRENTLY IF EXISTS audit_auditlog_log_organization_id_77c5a860;",
+                        "DROP INDEX CONCURRENTLY IF EXISTS audit_auditlog_log_organization_slug_58c9c7a5;",
+                        "DROP INDEX CONCURRENTLY IF EXISTS audit_auditlog_log_organization_slug_58c9c7a5_like;",
+                    ],
+                    reverse_sql=[
+                        "CREATE INDEX CONCURRENTLY IF NOT EXISTS audit_auditlog_log_organization_id_77c5a860 ON audit_auditlog (log_organization_id);",
+                        "CREATE INDEX CONCURRENTLY IF NOT EXISTS audit_auditlog_log_organization_slug_58c9c7a5 ON audit_auditlog (log_organization_slug);",
+                        "CREATE INDEX CONCURRENTLY IF NOT EXISTS audit_auditlog_log_organization_slug_58c9c7a5_like ON audit_auditlog (log_organization_slug varchar_pattern_ops);",
+                        "DROP INDEX CONCURRENTLY IF EXISTS audit_org_action_created_idx;",
+                    ],
+                    fallback=[
+                        migrations.AlterField(
+                            model_name="auditlog",
+                            name="log_organization_id",
+                            field=models.IntegerField(
+                                blank=True, null=True, verbose_name="Organization ID"
+                            ),
+                        ),
+                        migrations.AlterField(
+                            model_name="auditlog",
+                            name="log_organization_slug",
+                            field=models.CharField(
+                                blank=True,
+                                max_length=255,
+                                null=True,
+                                verbose_name="Organization slug",
+                            ),
+                        ),
+                        migrations.AddIndex(
+                            model_name="auditlog",
+                            index=models.Index(
+                                fields=["log_organization_id", "action", "-created"],
+                                name="audit_org_action_created_idx",
+                            ),
+                        ),
+                    ],
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,85 @@
+from django.db import migrations, models
+
+from readthedocs.core.utils.migrations import RunSQLPostgres
+
+
+class Migration(migrations.Migration):
+
+    """
+    Only index audit logs that are attached to an organization.
+
+    Most logs aren't attached to an organization,
+    indexing only the ones that are keeps the index small.
+    Logs that aren't attached to an organization are indexed by ``created``,
+    so they can be deleted without scanning the whole table.
+    """
+
+    # CREATE/DROP INDEX CONCURRENTLY can't be run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ("audit", "0011_auditlog_indexes"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.RemoveIndex(
+                    model_name="auditlog",
+                    name="audit_org_action_created_idx",
+                ),
+                migrations.AddIndex(
+                    model_name="auditlog",
+                    index=models.Index(
+                        condition=models.Q(log_organization_id__isnull=False),
+                        fields=["log_organization_id", "action", "-created"],
+                        name="audit_org_action_created_nn",
+                    ),
+                ),
+                migrations.AddIndex(
+                    model_name="auditlog",
+                    index=models.Index(
+                        condition=models.Q(log_organization_id__isnull=True),
+                        fields=["created"],
+                        name="audit_personal_created_idx",
+                    ),
+                ),
+            ],
+            database_operations=[
+                RunSQLPostgres(
+                    sql=[
+                        "CREATE INDEX CONCURRENTLY IF NOT EXISTS audit_org_action_created_nn ON audit_auditlog (log_organization_id, action, created DESC) WHERE log_organization_id IS NOT NULL;",
+                        "CREATE INDEX CONCURRENTLY IF NOT EXISTS audit_personal_created_idx ON audit_auditlog (created) WHERE log_organization_id IS NULL;",
+                        "DROP INDEX CONCURRENTLY IF EXISTS audit_org_action_created_idx;",
+                    ],
+                    reverse_sql=[
+                        "CREATE INDEX CONCURRENTLY IF NOT EXISTS audit_org_action_created_idx ON audit_auditlog (log_organization_id, action, created DESC);",
+                        "DROP INDEX CONCURRENTLY IF EXISTS audit_org_action_created_nn;",
+                        "DROP INDEX CONCURRENTLY IF EXISTS audit_personal_created_idx;",
+                    ],
+                    fallback=[
+                        migrations.RemoveIndex(
+                            model_name="auditlog",
+                            name="audit_org_action_created_idx",
+                        ),
+                        migrations.AddIndex(
+                            model_name="auditlog",
+                            index=models.Index(
+                                condition=models.Q(log_organization_id__isnull=False),
+                                fields=["log_organization_id", "action", "-created"],
+                                name="audit_org_action_created_nn",
+                            ),
+                        ),
+                        migrations.AddIndex(
+                            model_name="auditlog",
+                            index=models.Index(
+                                condition=models.Q(log_organization_id__isnull=True),
+                                fields=["created"],
+                                name="audit_personal_created_idx",
+                            ),
+                        ),
+                    ],
+                ),
+            ],
+        ),
+    ]
@@ -162,18 +162,17 @@ class AuditLog(TimeStampedModel):
         db_index=True,
         on_delete=models.SET_NULL,
     )
+    # Indexed together with ``action`` and ``created`` (see ``Meta.indexes``).
     log_organization_id = models.IntegerField(
         _('Organization ID'),
         blank=True,
         null=True,
-        db_index=True,
     )
     log_organization_slug = models.CharField(
         _('Organization slug'),
         max_length=255,
         blank=True,
         null=True,
-        db_index=True,
     )
 
     action = models.CharField(
@@ -220,6 +219,22 @@ class AuditLog(TimeStampedModel):
     class Meta:
 
         ordering = ['-created']
+        indexes = [
+            # Organization security logs are filtered by all these fields.
+            # Most logs aren't attached to an organization,
+            # so we only index the ones that are.
+            models.Index(
+                fields=["log_organization_id", "action", "-created"],
+                condition=models.Q(log_organization_id__isnull=False),
+                name="audit_org_action_created_nn",
+            ),
+            # Personal security logs are deleted by date.
+            models.Index(
+                fields=["created"],
+                condition=models.Q(log_organization_id__isnull=True),
+                name="audit_personal_created_idx",
+            ),
+        ]
 
     def save(self, **kwargs):
         if self.user:
@@ -2,6 +2,15 @@
 
 from django.db import migrations, models
 
+ACTION_CHOICES = (
+    ('activate-version', 'Activate version'),
+    ('hide-version', 'Hide version'),
+    ('make-version-public', 'Make version public'),
+    ('make-version-private', 'Make version private'),
+    ('set-default-version', 'Set version as default'),
+    ('delete-version', 'Delete version (on branch/tag deletion)'),
+)
+
 
 class Migration(migrations.Migration):
 
@@ -10,9 +19,15 @@ class Migration(migrations.Migration):
     ]
 
     operations = [
-        migrations.AlterField(
-            model_name='versionautomationrule',
-            name='action',
-            field=models.CharField(choices=[('activate-version', 'Activate version'), ('hide-version', 'Hide version'), ('make-version-public', 'Make version public'), ('make-version-private', 'Make version private'), ('set-default-version', 'Set version as default'), ('delete-version', 'Delete version (on branch/tag deletion)')], help_text='Action to apply to matching versions', max_length=32, verbose_name='Action'),
+        # Only the choices change, there is nothing to change in the database.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='versionautomationrule',
+                    name='action',
+                    field=models.CharField(choices=ACTION_CHOICES, help_text='Action to apply to matching versions', max_length=32, verbose_name='Action'),
+                ),
+            ],
+            database_operations=[],
         ),
     ]
@@ -2,15 +2,18 @@
 
 """Build configuration for rtd."""
 
-import copy
 import os
 import re
-from contextlib import contextmanager
-from functools import lru_cache
+import string
+from collections import OrderedDict
+from functools import cached_property, lru_cache
+from types import MappingProxyType
 
 from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
 
-from readthedocs.config.utils import list_to_dict, to_dict
+from readthedocs.config.utils import deep_copy, to_dict
 from readthedocs.core.utils.filesystem import safe_open
 from readthedocs.projects.constants import GENERIC
 
@@ -61,6 +64,14 @@ ALL = 'all'
 PIP = 'pip'
 SETUPTOOLS = 'setuptools'
 CONFIG_FILENAME_REGEX = r'^\.?readthedocs.ya?ml$'
+CONFIG_FILENAME_RE = re.compile(CONFIG_FILENAME_REGEX)
+# Matches keys with an index, like ``python.install.0.requirements``.
+DISPLAY_KEY_RE = re.compile(r'^([a-zA-Z_.-]+)\.(\d+)([a-zA-Z_.-]*)$')
+# Matches numeric versions of Docker images, like ``5.0``.
+IMAGE_VERSION_RE = re.compile(r'^[\d\.]+$')
+# Valid chars in apt packages names, names must start with an alphanumeric char.
+APT_PACKAGE_NAME_START_CHARS = frozenset(string.ascii_letters + string.digits)
+APT_PACKAGE_NAME_CHARS = APT_PACKAGE_NAME_START_CHARS | frozenset('.+-')
 
 CONFIG_NOT_SUPPORTED = 'config-not-supported'
 VERSION_INVALID = 'version-invalid'
@@ -75,6 +86,66 @@ INVALID_NAME = 'invalid-name'
 
 LATEST_CONFIGURATION_VERSION = 2
 
+# Valid values for the ranks of ``search.ranking``.
+VALID_SEARCH_RANKS = tuple(range(-10, 10 + 1))
+# Files that aren't indexed when ``search.ignore`` isn't given.
+SEARCH_IGNORE_DEFAULT = (
+    'search.html',
+    'search/index.html',
+    '404.html',
+    '404/index.html',
+)
+
+# Interpreter used by the ``build.tools.python`` versions that aren't CPython,
+# matched by the prefix of the version (e.g. ``mambaforge-4.10``).
+PYTHON_TOOL_INTERPRETERS = (
+    ('mamba', 'mamba'),
+    ('miniconda', 'conda'),
+)
+
+
+@lru_cache(maxsize=1)
+def _get_valid_build_images():
+    """
+    Return the valid Docker image choices from ``DOCKER_IMAGE_SETTINGS``.
+
+    The result only depends on settings, so it's computed once per process.
+    """
+    images = {'stable', 'latest', 'testing'}
+    for k in settings.DOCKER_IMAGE_SETTINGS:
+        _, version = k.split(':')
+        if IMAGE_VERSION_RE.fullmatch(version):
+            images.add(version)
+    return frozenset(images)
+
+
+@lru_cache(maxsize=1)
+def _get_all_python_versions():
+    """Return the Python versions supported by any of the Docker images."""
+    versions = set()
+    for options in settings.DOCKER_IMAGE_SETTINGS.values():
+        versions.update(options['python']['supported_versions'])
+    return frozenset(versions)
+
+
+@lru_cache(maxsize=256)
+def _split_key(key):
+    """
+    Split a dotted key (``key.innerkey``) into a tuple.
+
+    The same keys are popped for every config we validate,
+    so the result is cached.
+    """
+    return tuple(key.split('.'))
+
+
+@receiver(setting_changed)
+def clear_settings_cache(setting, **kwargs):
+    """Clear the values cached from settings when they are overridden (e.g. in tests)."""
+    if setting == 'DOCKER_IMAGE_SETTINGS':
+        _get_valid_build_images.cache_clear()
+        _get_all_python_versions.cache_clear()
+
 
 # TODO: make these exception to inherit from `BuildUserError`
 class ConfigError(Exception):
@@ -149,11 +220,36 @@ class InvalidConfig(ConfigError):
         For example ``python.install.0.requirements``
         is changed to `python.install[0].requirements`.
         """
-        return re.sub(
-            r'^([a-zA-Z_.-]+)\.(\d+)([a-zA-Z_.-]*)$',
-            r'\1[\2]\3',
-            self.key
-        )
+        return DISPLAY_KEY_RE.sub(r'\1[\2]\3', self.key)
+
+
+class CatchValidationError:
+
+    """
+    Context manager to catch a ``ValidationError`` and raise an ``InvalidConfig`` error.
+
+    This is used for every key that is validated,
+    a class is cheaper to enter and exit than a generator based context manager.
+    """
+
+    __slots__ = ('key', 'source_file')
+
+    def __init__(self, key, source_file):
+        self.key = key
+        self.source_file = source_file
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None and issubclass(exc_type, ValidationError):
+            raise InvalidConfig(
+                key=self.key,
+                code=exc_value.code,
+                error_message=str(exc_value),
+                source_file=self.source_file,
+            ) from exc_value
+        return False
 
 
 class BuildConfigBase:
@@ -168,13 +264,15 @@ class BuildConfigBase:
     :param env_config: A dict that contains additional information
                        about the environment.
     :param raw_config: A dict with all configuration without validation.
+                       It's kept as ``source_config``, so it shouldn't be modified
+                       after creating the object.
     :param source_file: The file that contains the configuration.
                         All paths are relative to this file.
                         If a dir is given, the configuration was loaded
                         from another source (like the web admin).
     """
 
-    PUBLIC_ATTRIBUTES = [
+    PUBLIC_ATTRIBUTES = (
         'version',
         'formats',
         'python',
@@ -185,7 +283,7 @@ class BuildConfigBase:
         'mkdocs',
         'submodules',
         'search',
-    ]
+    )
 
     default_build_image = settings.DOCKER_DEFAULT_VERSION
 
@@ -193,10 +291,13 @@ class BuildConfigBase:
 
     def __init__(self, env_config, raw_config, source_file):
         self.env_config = env_config
-        self._raw_config = copy.deepcopy(raw_config)
-        self.source_config = copy.deepcopy(raw_config)
+        # Only ``_raw_config`` is modified while validating,
+        # ``source_config`` keeps a reference to the original configuration.
+        self._raw_config = deep_copy(raw_config)
+        self.source_config = raw_config
         self.source_file = source_file
-        if os.path.isdir(self.source_file):
+        self._source_is_dir = os.path.isdir(self.source_file)
+        if self._source_is_dir:
             self.base_path = self.source_file
         else:
             self.base_path = os.path.dirname(self.source_file)
@@ -206,7 +307,7 @@ class BuildConfigBase:
 
     def error(self, key, message, code):
         """Raise an error related to ``key``."""
-        if not os.path.isdir(self.source_file):
+        if not self._source_is_dir:
             source = os.path.relpath(self.source_file, self.base_path)
             error_message = '{source}: {message}'.format(
                 source=source,
@@ -221,18 +322,9 @@ class BuildConfigBase:
             source_file=self.source_file,
         )
 
-    @contextmanager
     def catch_validation_error(self, key):
         """Catch a ``ValidationError`` and raises an ``InvalidConfig`` error."""
-        try:
-            yield
-        except ValidationError as error:
-            raise InvalidConfig(
-                key=key,
-                code=error.code,
-                error_message=str(error),
-                source_file=self.source_file,
-            )
+        return CatchValidationError(key, self.source_file)
 
     def pop(self, name, container, default, raise_ex):
         """
@@ -245,19 +337,26 @@ class BuildConfigBase:
         :param default: default value to return if the key doesn't exists
         :param raise_ex: if True, raises an exception when a key is not found
         """
-        key = name[0]
-        validate_dict(container)
-        if key in container:
-            if len(name) > 1:
-                value = self.pop(name[1:], container[key], default, raise_ex)
-                if not container[key]:
-                    container.pop(key)
-            else:
+        value = default
+        # Containers we went through, so we can remove them if they are left empty.
+        parents = []
+        last_index = len(name) - 1
+        for index, key in enumerate(name):
+            validate_dict(container)
+            if key not in container:
+                if raise_ex:
+                    raise ValidationError(key, VALUE_NOT_FOUND)
+                break
+            if index == last_index:
                 value = container.pop(key)
-            return value
-        if raise_ex:
-            raise ValidationError(key, VALUE_NOT_FOUND)
-        return default
+                break
+            parents.append((container, key))
+            container = container[key]
+
+        for parent, key in reversed(parents):
+            if not parent[key]:
+                parent.pop(key)
+        return value
 
     def pop_config(self, key, default=None, raise_ex=False):
         """
@@ -267,7 +366,7 @@ class BuildConfigBase:
         :param default: Optionally, it can receive a default value
         :param raise_ex: If True, raises an exception when the key is not found
         """
-        return self.pop(key.split('.'), self._raw_config, default, raise_ex)
+        return self.pop(_split_key(key), self._raw_config, default, raise_ex)
 
     def validate(self):
         raise NotImplementedError()
@@ -285,22 +384,21 @@ class BuildConfigBase:
     @property
     def is_using_setup_py_install(self):
         """Check if this project is using `setup.py install` as installation method."""
-        for install in self.python.install:
-            if isinstance(install, PythonInstall) and install.method == SETUPTOOLS:
-                return True
-        return False
+        return any(
+            isinstance(install, PythonInstall) and install.method == SETUPTOOLS
+            for install in self.python.install
+        )
 
     @property
     def python_interpreter(self):
         if self.using_build_tools:
             tool = self.build.tools.get('python')
-            if tool and tool.version.startswith('mamba'):
-                return 'mamba'
-            if tool and tool.version.startswith('miniconda'):
-                return 'conda'
-            if tool:
-                return 'python'
-            return None
+            if not tool:
+                return None
+            for prefix, interpreter in PYTHON_TOOL_INTERPRETERS:
+                if tool.version.startswith(prefix):
+                    return interpreter
+            return 'python'
         version = self.python_full_version
         if version.startswith('pypy'):
             # Allow to specify ``pypy3.5`` as Python interpreter
@@ -333,12 +431,7 @@ class BuildConfigBase:
         the keys of ``DOCKER_IMAGE_SETTINGS`` Django setting (without the
         ``readthedocs/build`` part) plus ``stable``, ``latest`` and ``testing``.
         """
-        images = {'stable', 'latest', 'testing'}
-        for k in settings.DOCKER_IMAGE_SETTINGS:
-            _, version = k.split(':')
-            if re.fullmatch(r'^[\d\.]+$', version):
-                images.add(version)
-        return images
+        return _get_valid_build_images()
 
     def get_valid_python_versions_for_image(self, build_image):
         """
@@ -350,12 +443,7 @@ class BuildConfigBase:
         Returns supported versions for the ``DOCKER_DEFAULT_VERSION`` if not
         ``build_image`` found.
         """
-        if build_image not in settings.DOCKER_IMAGE_SETTINGS:
-            build_image = '{}:{}'.format(
-                settings.DOCKER_DEFAULT_IMAGE,
-                self.default_build_image,
-            )
-        return settings.DOCKER_IMAGE_SETTINGS[build_image]['python']['supported_versions']
+        return self._get_image_settings(build_image)['python']['supported_versions']
 
     def get_default_python_version_for_image(self, build_image, python_version):
         """
@@ -372,16 +460,20 @@ class BuildConfigBase:
         :returns: default version for the ``DOCKER_DEFAULT_VERSION`` if not
                   ``build_image`` found.
         """
-        if build_image not in settings.DOCKER_IMAGE_SETTINGS:
-            build_image = '{}:{}'.format(
-                settings.DOCKER_DEFAULT_IMAGE,
-                self.default_build_image,
-            )
-        return (
-            # For linting
-            settings.DOCKER_IMAGE_SETTINGS[build_image]['python']
-            ['default_version'][python_version]
-        )
+        image_settings = self._get_image_settings(build_image)
+        return image_settings['python']['default_version'][python_version]
+
+    def _get_image_settings(self, build_image):
+        """
+        Return the settings from ``DOCKER_IMAGE_SETTINGS`` for ``build_image``.
+
+        Settings for the ``DOCKER_DEFAULT_VERSION`` image are returned
+        if ``build_image`` isn't found.
+        """
+        images_settings = settings.DOCKER_IMAGE_SETTINGS
+        if build_image not in images_settings:
+            build_image = f'{settings.DOCKER_DEFAULT_IMAGE}:{self.default_build_image}'
+        return images_settings[build_image]
 
     def as_dict(self):
         config = {}
@@ -417,12 +509,7 @@ class BuildConfigV1(BuildConfigBase):
         try:
             return self.env_config['python']['supported_versions']
         except (KeyError, TypeError):
-            versions = set()
-            for _, options in settings.DOCKER_IMAGE_SETTINGS.items():
-                versions = versions.union(
-                    options['python']['supported_versions']
-                )
-            return versions
+            return _get_all_python_versions()
 
     def get_valid_formats(self):  # noqa
         """Get all valid documentation formats."""
@@ -550,11 +637,11 @@ class BuildConfigV1(BuildConfigBase):
                 if not python['install_with_pip']:
                     python['extra_requirements'] = []
                 else:
-                    for extra_name in raw_extra_requirements:
-                        with self.catch_validation_error('python.extra_requirements'):
-                            python['extra_requirements'].append(
-                                validate_string(extra_name),
-                            )
+                    with self.catch_validation_error('python.extra_requirements'):
+                        python['extra_requirements'] = [
+                            validate_string(extra_name)
+                            for extra_name in raw_extra_requirements
+                        ]
 
             # Validate setup_py_install.
             if 'setup_py_install' in raw_python:
@@ -670,8 +757,7 @@ class BuildConfigV1(BuildConfigBase):
             return Conda(**self._config['conda'])
         return None
 
-    @property
-    @lru_cache(maxsize=1)
+    @cached_property
     def build(self):
         """The docker image used by the builders."""
         return Build(**self._config['build'])
@@ -717,13 +803,13 @@ class BuildConfigV2(BuildConfigBase):
 
     version = '2'
     valid_formats = ['htmlzip', 'pdf', 'epub']
-    valid_install_method = [PIP, SETUPTOOLS]
-    valid_sphinx_builders = {
+    valid_install_method = (PIP, SETUPTOOLS)
+    valid_sphinx_builders = MappingProxyType({
         'html': 'sphinx',
         'htmldir': 'sphinx_htmldir',
         'dirhtml': 'sphinx_htmldir',
         'singlehtml': 'sphinx_singlehtml',
-    }
+    })
 
     @property
     def settings(self):
@@ -760,6 +846,9 @@ class BuildConfigV2(BuildConfigBase):
         formats = self.pop_config('formats', [])
         if formats == ALL:
             return self.valid_formats
+        # Nothing to validate (this is the default).
+        if formats == []:
+            return formats
         with self.catch_validation_error('formats'):
             validate_list(formats)
             for format_ in formats:
@@ -845,10 +934,8 @@ class BuildConfigV2(BuildConfigBase):
                     for job_command in validate_list(job_commands)
                 ]
 
-        build["commands"] = []
-        for command in commands:
-            with self.catch_validation_error("build.commands"):
-                build["commands"].append(validate_string(command))
+        with self.catch_validation_error("build.commands"):
+            build["commands"] = [validate_string(command) for command in commands]
 
         build['tools'] = {}
         if tools:
@@ -888,23 +975,16 @@ class BuildConfigV2(BuildConfigBase):
         return build
 
     def validate_apt_packages(self):
-        apt_packages = []
         with self.catch_validation_error('build.apt_packages'):
-            raw_packages = self._raw_config.get('build', {}).get('apt_packages', [])
+            raw_packages = self.pop_config('build.apt_packages', [])
             validate_list(raw_packages)
-            # Transform to a dict, so is easy to validate individual entries.
-            self._raw_config.setdefault('build', {})['apt_packages'] = (
-                list_to_dict(raw_packages)
-            )
-
-            apt_packages = [
-                self.validate_apt_package(index)
-                for index in range(len(raw_packages))
-            ]
-            if not raw_packages:
-                self.pop_config('build.apt_packages')
 
-        return apt_packages
+        # Packages are validated one by one,
+        # so errors point to the index of the invalid package.
+        return [
+            self.validate_apt_package(index, package)
+            for index, package in enumerate(raw_packages)
+        ]
 
     def validate_build(self):
         raw_build = self._raw_config.get('build', {})
@@ -914,7 +994,7 @@ class BuildConfigV2(BuildConfigBase):
             return self.validate_build_config_with_os()
         return self.validate_old_build_config()
 
-    def validate_apt_package(self, index):
+    def validate_apt_package(self, index, package):
         """
         Validate the package name to avoid injections of extra options.
 
@@ -924,30 +1004,30 @@ class BuildConfigV2(BuildConfigBase):
         for allowed chars in packages names.
         """
         key = f'build.apt_packages.{index}'
-        package = self.pop_config(key)
         with self.catch_validation_error(key):
             validate_string(package)
             package = package.strip()
-            invalid_starts = [
+            invalid_starts = (
                 # Don't allow extra options.
                 '-',
                 # Don't allow to install from a path.
                 '/',
                 '.',
-            ]
-            for start in invalid_starts:
-                if package.startswith(start):
-                    self.error(
-                        key=key,
-                        message=(
-                            'Invalid package name. '
-                            f'Package can\'t start with {start}.',
-                        ),
-                        code=INVALID_NAME,
-                    )
-            # List of valid chars in packages names.
-            pattern = re.compile(r'^[a-zA-Z0-9][a-zA-Z0-9.+-]*$')
-            if not pattern.match(package):
+            )
+            if package.startswith(invalid_starts):
+                self.error(
+                    key=key,
+                    message=(
+                        'Invalid package name. '
+                        f'Package can\'t start with {package[0]}.',
+                    ),
+                    code=INVALID_NAME,
+                )
+            if (
+                not package
+                or package[0] not in APT_PACKAGE_NAME_START_CHARS
+                or not APT_PACKAGE_NAME_CHARS.issuperset(package)
+            ):
                 self.error(
                     key=key,
                     message='Invalid package name.',
@@ -993,22 +1073,27 @@ class BuildConfigV2(BuildConfigBase):
                 )
 
         with self.catch_validation_error('python.install'):
-            raw_install = self._raw_config.get('python', {}).get('install', [])
+            raw_install = raw_python.get('install', [])
             validate_list(raw_install)
-            if raw_install:
-                # Transform to a dict, so it's easy to validate extra keys.
-                self._raw_config.setdefault('python', {})['install'] = (
-                    list_to_dict(raw_install)
-                )
-            else:
-                self.pop_config('python.install')
 
-        raw_install = self._raw_config.get('python', {}).get('install', [])
         python['install'] = [
-            self.validate_python_install(index)
-            for index in range(len(raw_install))
+            self.validate_python_install(index, install)
+            for index, install in enumerate(raw_install)
         ]
 
+        # Keys are popped from each install dictionary while validating,
+        # only the ones with extra keys are kept (in dict form),
+        # so they are reported as ``python.install.{index}.{key}`` by ``validate_keys``.
+        extra_install = {
+            str(index): install
+            for index, install in enumerate(raw_install)
+            if install
+        }
+        if extra_install:
+            raw_python['install'] = extra_install
+        else:
+            self.pop_config('python.install')
+
         with self.catch_validation_error('python.system_packages'):
             system_packages = self.pop_config(
                 'python.system_packages',
@@ -1018,11 +1103,15 @@ class BuildConfigV2(BuildConfigBase):
 
         return python
 
-    def validate_python_install(self, index):
-        """Validates the python.install.{index} key."""
+    def validate_python_install(self, index, raw_install):
+        """
+        Validates the python.install.{index} key.
+
+        Keys are popped from the install dictionary (``raw_install``) directly,
+        instead of walking the whole configuration for each key with ``pop_config``.
+        """
         python_install = {}
         key = 'python.install.{}'.format(index)
-        raw_install = self._raw_config['python']['install'][str(index)]
         with self.catch_validation_error(key):
             validate_dict(raw_install)
 
@@ -1030,7 +1119,7 @@ class BuildConfigV2(BuildConfigBase):
             requirements_key = key + '.requirements'
             with self.catch_validation_error(requirements_key):
                 requirements = validate_path(
-                    self.pop_config(requirements_key),
+                    raw_install.pop('requirements'),
                     self.base_path,
                 )
                 python_install['requirements'] = requirements
@@ -1038,7 +1127,7 @@ class BuildConfigV2(BuildConfigBase):
             path_key = key + '.path'
             with self.catch_validation_error(path_key):
                 path = validate_path(
-                    self.pop_config(path_key),
+                    raw_install.pop('path'),
                     self.base_path,
                 )
                 python_install['path'] = path
@@ -1046,7 +1135,7 @@ class BuildConfigV2(BuildConfigBase):
             method_key = key + '.method'
             with self.catch_validation_error(method_key):
                 method = validate_choice(
-                    self.pop_config(method_key, PIP),
+                    raw_install.pop('method', PIP),
                     self.valid_install_method,
                 )
                 python_install['method'] = method
@@ -1054,7 +1143,7 @@ class BuildConfigV2(BuildConfigBase):
             extra_req_key = key + '.extra_requirements'
             with self.catch_validation_error(extra_req_key):
                 extra_requirements = validate_list(
-                    self.pop_config(extra_req_key, []),
+                    raw_install.pop('extra_requirements', []),
                 )
                 if extra_requirements and python_install['method'] != PIP:
                     self.error(
@@ -1177,7 +1266,11 @@ class BuildConfigV2(BuildConfigBase):
         - We can use the ``ALL`` keyword in include or exclude.
         - We can't exclude and include submodules at the same time.
         """
-        raw_submodules = self._raw_config.get('submodules', {})
+        if 'submodules' not in self._raw_config:
+            # Nothing to validate (this is the default).
+            return {'include': [], 'exclude': ALL, 'recursive': False}
+
+        raw_submodules = self._raw_config['submodules']
         with self.catch_validation_error('submodules'):
             validate_dict(raw_submodules)
 
@@ -1185,20 +1278,16 @@ class BuildConfigV2(BuildConfigBase):
         with self.catch_validation_error('submodules.include'):
             include = self.pop_config('submodules.include', [])
             if include != ALL:
-                include = [
-                    validate_string(submodule)
-                    for submodule in validate_list(include)
-                ]
+                validate_list(include)
+                include = [validate_string(submodule) for submodule in include]
             submodules['include'] = include
 
         with self.catch_validation_error('submodules.exclude'):
             default = [] if submodules['include'] else ALL
             exclude = self.pop_config('submodules.exclude', default)
             if exclude != ALL:
-                exclude = [
-                    validate_string(submodule)
-                    for submodule in validate_list(exclude)
-                ]
+                validate_list(exclude)
+                exclude = [validate_string(submodule) for submodule in exclude]
             submodules['exclude'] = exclude
 
         with self.catch_validation_error('submodules'):
@@ -1229,7 +1318,11 @@ class BuildConfigV2(BuildConfigBase):
         - The path pattern supports basic globs (*, ?, [seq]).
         - The rank can be a integer number between -10 and 10.
         """
-        raw_search = self._raw_config.get('search', {})
+        if 'search' not in self._raw_config:
+            # Nothing to validate (this is the default).
+            return {'ranking': {}, 'ignore': list(SEARCH_IGNORE_DEFAULT)}
+
+        raw_search = self._raw_config['search']
         with self.catch_validation_error('search'):
             validate_dict(raw_search)
 
@@ -1238,24 +1331,19 @@ class BuildConfigV2(BuildConfigBase):
             ranking = self.pop_config('search.ranking', {})
             validate_dict(ranking)
 
-            valid_rank_range = list(range(-10, 10 + 1))
-
             final_ranking = {}
             for pattern, rank in ranking.items():
                 pattern = validate_path_pattern(pattern)
-                validate_choice(rank, valid_rank_range)
+                validate_choice(rank, VALID_SEARCH_RANKS)
                 final_ranking[pattern] = rank
 
             search['ranking'] = final_ranking
 
         with self.catch_validation_error('search.ignore'):
-            ignore_default = [
-                'search.html',
-                'search/index.html',
-                '404.html',
-                '404/index.html',
-            ]
-            search_ignore = self.pop_config('search.ignore', ignore_default)
+            search_ignore = self.pop_config(
+                'search.ignore',
+                list(SEARCH_IGNORE_DEFAULT),
+            )
             validate_list(search_ignore)
 
             final_ignore = [
@@ -1280,6 +1368,8 @@ class BuildConfigV2(BuildConfigBase):
         # The version key isn't popped, but it's
         # validated in `load`.
         self.pop_config('version', None)
+        if not self._raw_config:
+            return
         wrong_key = '.'.join(self._get_extra_key(self._raw_config))
         if wrong_key:
             self.error(
@@ -1304,23 +1394,24 @@ class BuildConfigV2(BuildConfigBase):
 
         Will return `['key', 'name']`.
         """
-        if isinstance(value, dict) and value:
+        keys = []
+        while isinstance(value, dict) and value:
             key_name = next(iter(value))
-            return [key_name] + self._get_extra_key(value[key_name])
-        return []
+            keys.append(key_name)
+            value = value[key_name]
+        return keys
 
     @property
     def formats(self):
         return self._config['formats']
 
-    @property
+    @cached_property
     def conda(self):
         if self._config['conda']:
             return Conda(**self._config['conda'])
         return None
 
-    @property
-    @lru_cache(maxsize=1)
+    @cached_property
     def build(self):
         build = self._config['build']
         if 'os' in build:
@@ -1340,7 +1431,7 @@ class BuildConfigV2(BuildConfigBase):
             )
         return Build(**build)
 
-    @property
+    @cached_property
     def python(self):
         python_install = []
         python = self._config['python']
@@ -1355,32 +1446,32 @@ class BuildConfigV2(BuildConfigBase):
             use_system_site_packages=python['use_system_site_packages'],
         )
 
-    @property
+    @cached_property
     def sphinx(self):
         if self._config['sphinx']:
             return Sphinx(**self._config['sphinx'])
         return None
 
-    @property
+    @cached_property
     def mkdocs(self):
         if self._config['mkdocs']:
             return Mkdocs(**self._config['mkdocs'])
         return None
 
-    @property
+    @cached_property
     def doctype(self):
-        if "commands" in self._config["build"] and self._config["build"]["commands"]:
+        if self._config["build"].get("commands"):
             return GENERIC
 
         if self.mkdocs:
             return 'mkdocs'
         return self.sphinx.builder
 
-    @property
+    @cached_property
     def submodules(self):
         return Submodules(**self._config['submodules'])
 
-    @property
+    @cached_property
     def search(self):
         return Search(**self._config['search'])
 
@@ -1402,7 +1493,7 @@ def load(path, env_config, readthedocs_yaml_path=None):
             raise ConfigFileNotFound(os.path.relpath(filename, path))
     # Default behavior
     else:
-        filename = find_one(path, CONFIG_FILENAME_REGEX)
+        filename = find_one(path, CONFIG_FILENAME_RE)
         if not filename:
             # This exception is current caught higher up and will result in an attempt
             # to load the v1 config schema.
@@ -1413,7 +1504,7 @@ def load(path, env_config, readthedocs_yaml_path=None):
         filename, "r", allow_symlinks=True, base_path=path
     ) as configuration_file:
         try:
-            config = parse(configuration_file.read())
+            config = _parse_config_file(configuration_file, filename)
         except ParseError as error:
             raise ConfigError(
                 'Parse error in {filename}: {message}'.format(
@@ -1433,19 +1524,62 @@ def load(path, env_config, readthedocs_yaml_path=None):
     return build_config
 
 
+# Parsed configuration files, from the least to the most recently used.
+_parsed_configs = OrderedDict()
+PARSED_CONFIGS_CACHE_SIZE = 100
+
+
+def _parse_config_file(configuration_file, filename):
+    """
+    Parse an open configuration file, reusing the result if it was already parsed.
+
+    Results are cached by the absolute path of the file
+    and its device, inode, size and modification time,
+    so a file is parsed again if it changes or if its inode is reused by another file.
+    Only the parsed YAML is cached, validation depends on ``env_config``.
+
+    The cached object is returned without copying it,
+    ``BuildConfigBase`` copies it before modifying it.
+    """
+    stat = os.fstat(configuration_file.fileno())
+    key = (
+        os.path.abspath(filename),
+        stat.st_dev,
+        stat.st_ino,
+        stat.st_size,
+        stat.st_mtime_ns,
+    )
+    config = _parsed_configs.get(key)
+    if config is None:
+        config = parse(configuration_file.read())
+        _parsed_configs[key] = config
+        if len(_parsed_configs) > PARSED_CONFIGS_CACHE_SIZE:
+            _parsed_configs.popitem(last=False)
+    else:
+        _parsed_configs.move_to_end(key)
+    return config
+
+
+def clear_parsed_configs_cache():
+    """Clear the parsed configuration files (e.g. between tests)."""
+    _parsed_configs.clear()
+
+
+CONFIGURATION_CLASSES = {
+    1: BuildConfigV1,
+    2: BuildConfigV2,
+}
+
+
 def get_configuration_class(version):
     """
     Get the appropriate config class for ``version``.
 
     :type version: str or int
     """
-    configurations_class = {
-        1: BuildConfigV1,
-        2: BuildConfigV2,
-    }
     try:
         version = int(version)
-        return configurations_class[version]
+        return CONFIGURATION_CLASSES[version]
     except (KeyError, ValueError):
         raise InvalidConfig(
             'version',
@@ -6,7 +6,11 @@ import re
 
 
 def find_one(path, filename_regex):
-    """Find the first file in ``path`` that match ``filename_regex`` regex."""
+    """
+    Find the first file in ``path`` that match ``filename_regex`` regex.
+
+    ``filename_regex`` can be a string or a compiled regular expression.
+    """
     _path = os.path.abspath(path)
     for filename in os.listdir(_path):
         if re.match(filename_regex, filename):
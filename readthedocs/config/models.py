@@ -13,8 +13,12 @@ class Base:
 
     We are using `__slots__` so we can't add more attributes by mistake,
     this is similar to a namedtuple.
+    The base class defines an empty `__slots__`,
+    otherwise instances would still have a `__dict__`.
     """
 
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         for name in self.__slots__:
             setattr(self, name, kwargs[name])
@@ -5,6 +5,10 @@ import yaml
 
 __all__ = ('parse', 'ParseError')
 
+# Use the libyaml based loader when PyYAML was built with it,
+# it's several times faster than the pure Python loader.
+SafeLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
 
 class ParseError(Exception):
 
@@ -19,7 +23,7 @@ def parse(stream):
     Everything else raises a ``ParseError``.
     """
     try:
-        config = yaml.safe_load(stream)
+        config = yaml.load(stream, Loader=SafeLoader)
     except yaml.YAMLError as error:
         raise ParseError('YAML: {message}'.format(message=error))
     if not isinstance(config, dict):
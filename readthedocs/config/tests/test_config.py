@@ -40,6 +40,7 @@ from readthedocs.config.models import (
     PythonInstall,
     PythonInstallRequirements,
 )
+from readthedocs.config.parser import parse
 from readthedocs.config.validation import (
     INVALID_BOOL,
     INVALID_CHOICE,
@@ -134,6 +135,32 @@ def test_load_version2(tmpdir):
     assert isinstance(build, BuildConfigV2)
 
 
+def test_load_reuses_parsed_config_file(tmpdir):
+    apply_fs(
+        tmpdir, {
+            'readthedocs.yml': textwrap.dedent('''
+            version: 2
+        '''),
+        },
+    )
+    base = str(tmpdir)
+    with patch('readthedocs.config.config.parse', wraps=parse) as parse_mock:
+        with override_settings(DOCROOT=tmpdir):
+            first = load(base, {})
+            second = load(base, {})
+    assert parse_mock.call_count == 1
+    assert first.source_config is second.source_config
+    assert first._raw_config is not second._raw_config
+
+    # The file is parsed again if it changes.
+    tmpdir.join('readthedocs.yml').write('version: 1')
+    with patch('readthedocs.config.config.parse', wraps=parse) as parse_mock:
+        with override_settings(DOCROOT=tmpdir):
+            build = load(base, {})
+    assert parse_mock.call_count == 1
+    assert isinstance(build, BuildConfigV1)
+
+
 def test_load_unknow_version(tmpdir):
     apply_fs(
         tmpdir, {
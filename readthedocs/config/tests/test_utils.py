@@ -1,3 +1,5 @@
+from readthedocs.config.utils import deep_copy
+
 from .utils import apply_fs
 
 
@@ -24,3 +26,20 @@ def test_apply_fs_create_subdirectory(tmpdir):
     # Create file with content.
     apply_fs(tmpdir, {'subdir': {'file': 'content'}})
     assert tmpdir.join('subdir', 'file').read() == 'content'
+
+
+def test_deep_copy():
+    value = {
+        'key': 'value',
+        'number': 1,
+        'nested': {'list': ['one', {'two': 2}], 'none': None},
+    }
+    copied = deep_copy(value)
+    assert copied == value
+    assert copied is not value
+    assert copied['nested'] is not value['nested']
+    assert copied['nested']['list'] is not value['nested']['list']
+    assert copied['nested']['list'][1] is not value['nested']['list'][1]
+
+    copied['nested']['list'].append('three')
+    assert value['nested']['list'] == ['one', {'two': 2}]
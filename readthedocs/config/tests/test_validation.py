@@ -49,6 +49,14 @@ class TestValidateChoice:
             validate_choice('not-a-choice', ('choice', 'another_choice'))
         assert excinfo.value.code == INVALID_CHOICE
 
+    def test_it_accepts_keys_as_choices(self):
+        choices = {'choice': 1, 'another_choice': 2}
+        assert validate_choice('choice', choices.keys()) == 'choice'
+
+        with raises(ValidationError) as excinfo:
+            validate_choice(['choice'], choices.keys())
+        assert excinfo.value.code == INVALID_CHOICE
+
 
 class TestValidateList:
 
@@ -1,5 +1,7 @@
 """Shared functions for the config module."""
 
+import copy
+
 
 def to_dict(value):
     """Recursively transform a class from `config.models` to a dict."""
@@ -25,3 +27,21 @@ def list_to_dict(list_):
         for i, element in enumerate(list_)
     }
     return dict_
+
+
+def deep_copy(value):
+    """
+    Recursively copy a configuration parsed from a YAML file.
+
+    This is faster than ``copy.deepcopy`` for the types we get from YAML,
+    dicts and lists are copied and scalars are immutable, so they are reused.
+    Any other type falls back to ``copy.deepcopy``.
+    """
+    type_ = type(value)
+    if type_ is dict:
+        return {k: deep_copy(v) for k, v in value.items()}
+    if type_ is list:
+        return [deep_copy(v) for v in value]
+    if type_ in (str, int, float, bool, type(None)):
+        return value
+    return copy.deepcopy(value)
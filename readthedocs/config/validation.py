@@ -56,7 +56,10 @@ def validate_dict(value):
 
 def validate_choice(value, choices):
     """Check that ``value`` is in ``choices``."""
-    choices = validate_list(choices)
+    # Avoid copying ``choices`` when it's already a sequence,
+    # this is called for every key we validate.
+    if not isinstance(choices, (list, tuple)):
+        choices = validate_list(choices)
     if value not in choices:
         raise ValidationError(
             value,
@@ -21,7 +21,10 @@ def clear_cache():
     We have code that will error, as the cache will
     reference to things that don't exist in other test case.
     """
+    from readthedocs.config.config import clear_parsed_configs_cache
+
     # Code run before each test
     yield
     # Code run afer each test
     cache.clear()
+    clear_parsed_configs_cache()
@@ -0,0 +1,55 @@
+"""Utilities for writing migrations that are safe to run on big tables."""
+
+from django.db import migrations
+
+
+class RunSQLPostgres(migrations.RunSQL):
+
+    """
+    Run raw SQL only when the database is PostgreSQL.
+
+    This is useful for DDL that depends on PostgreSQL specific features,
+    like ``CREATE INDEX CONCURRENTLY``, which doesn't lock the table for writes.
+
+    On other databases (we use SQLite for tests and local development)
+    the ``fallback`` operations are run instead.
+    """
+
+    def __init__(self, sql, reverse_sql=None, fallback=None, **kwargs):
+        super().__init__(sql, reverse_sql=reverse_sql, **kwargs)
+        self.fallback = fallback or []
+
+    def deconstruct(self):
+        name, args, kwargs = super().deconstruct()
+        if self.fallback:
+            kwargs["fallback"] = self.fallback
+        return name, args, kwargs
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+            return
+
+        for operation in self.fallback:
+            to_state = from_state.clone()
+            operation.state_forwards(app_label, to_state)
+            operation.database_forwards(app_label, schema_editor, from_state, to_state)
+            from_state = to_state
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+            return
+
+        # Same as ``SeparateDatabaseAndState.database_backwards``,
+        # we need to calculate the intermediate states ourselves.
+        to_states = {}
+        for operation in self.fallback:
+            to_states[operation] = to_state
+            to_state = to_state.clone()
+            operation.state_forwards(app_label, to_state)
+
+        for operation in reversed(self.fallback):
+            from_state = to_state
+            to_state = to_states[operation]
+            operation.database_backwards(app_label, schema_editor, from_state, to_state)
@@ -2,6 +2,7 @@
 
 import re
 import urllib.parse
+from functools import lru_cache
 from urllib.parse import urlparse
 
 import requests
@@ -24,6 +25,21 @@ from readthedocs.storage import build_media_storage
 log = structlog.get_logger(__name__)
 
 
+@lru_cache(maxsize=8)
+def get_allowed_domains_regex(domains):
+    """
+    Compile the allowed domains into a single regex.
+
+    Each pattern matches from the start of the domain, like ``re.match``.
+    ``None`` is returned if there aren't allowed domains.
+
+    :param domains: tuple of regex patterns, from ``RTD_EMBED_API_EXTERNAL_DOMAINS``
+    """
+    if not domains:
+        return None
+    return re.compile('|'.join(f'(?:{domain})' for domain in domains))
+
+
 class IsAuthorizedToGetContenFromVersion(IsAuthorizedToViewVersion):
 
     """
@@ -304,10 +320,10 @@ class EmbedAPIBase(EmbedAPIMixin, CDNCacheTagsMixin, APIView):
             )
 
         if self.external:
-            for allowed_domain in settings.RTD_EMBED_API_EXTERNAL_DOMAINS:
-                if re.match(allowed_domain, domain):
-                    break
-            else:
+            allowed_domains_re = get_allowed_domains_regex(
+                tuple(settings.RTD_EMBED_API_EXTERNAL_DOMAINS)
+            )
+            if not allowed_domains_re or not allowed_domains_re.match(domain):
                 log.info('Domain not allowed.', domain=domain, url=url)
                 return Response(
                     {
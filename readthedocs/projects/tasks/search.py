@@ -1,5 +1,6 @@
 import json
-from fnmatch import fnmatch
+import re
+from fnmatch import translate
 
 import structlog
 from django.conf import settings
@@ -245,6 +246,16 @@ def _create_intersphinx_data(version, commit, build):
             )
 
 
+def _compile_path_pattern(pattern):
+    """
+    Compile a path pattern from the ``search`` config into a regex.
+
+    Same as ``fnmatch.fnmatch``, paths are always POSIX paths here,
+    so they don't need to be normalized.
+    """
+    return re.compile(translate(pattern))
+
+
 def _create_imported_files(*, version, commit, build, search_ranking, search_ignore):
     """
     Create imported files for version.
@@ -253,6 +264,16 @@ def _create_imported_files(*, version, commit, build, search_ranking, search_ign
     :param commit: Commit that updated path
     :param build: Build id
     """
+    # Compile the patterns once, instead of matching them for each file.
+    # Last pattern to match takes precedence
+    # XXX: see if we can implement another type of precedence,
+    # like the longest pattern.
+    ranking_patterns = [
+        (_compile_path_pattern(pattern), rank)
+        for pattern, rank in reversed(list(search_ranking.items()))
+    ]
+    ignore_patterns = [_compile_path_pattern(pattern) for pattern in search_ignore]
+
     # Re-create all objects from the new build of the version
     storage_path = version.project.get_storage_path(
         type_='html', version_slug=version.slug, include_file=False
@@ -269,20 +290,12 @@ def _create_imported_files(*, version, commit, build, search_ranking, search_ign
             relpath = full_path.replace(storage_path, '', 1).lstrip('/')
 
             page_rank = 0
-            # Last pattern to match takes precedence
-            # XXX: see if we can implement another type of precedence,
-            # like the longest pattern.
-            reverse_rankings = reversed(list(search_ranking.items()))
-            for pattern, rank in reverse_rankings:
-                if fnmatch(relpath, pattern):
+            for pattern, rank in ranking_patterns:
+                if pattern.match(relpath):
                     page_rank = rank
                     break
 
-            ignore = False
-            for pattern in search_ignore:
-                if fnmatch(relpath, pattern):
-                    ignore = True
-                    break
+            ignore = any(pattern.match(relpath) for pattern in ignore_patterns)
 
             # Create imported files from new build
             HTMLFile.objects.create(
@@ -1,53 +1,110 @@
 import os
+import shutil
 import textwrap
 from os.path import exists
-from tempfile import mkdtemp
+from tempfile import TemporaryDirectory
 from unittest import mock
 from unittest.mock import Mock, patch
 
-import django_dynamic_fixture as fixture
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import User
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase
 
 from readthedocs.builds.constants import EXTERNAL
 from readthedocs.builds.models import Version
 from readthedocs.config import ALL
-from readthedocs.doc_builder.environments import LocalBuildEnvironment
+from readthedocs.doc_builder.environments import (
+    BuildCommand,
+    LocalBuildEnvironment,
+)
 from readthedocs.projects.exceptions import RepositoryError
 from readthedocs.projects.models import Feature, Project
 from readthedocs.rtd_tests.utils import (
-    create_git_branch,
+    clone_test_git,
+    copy_test_repo,
+    create_git_refs,
     create_git_tag,
-    delete_git_branch,
-    delete_git_tag,
+    delete_git_refs,
     get_current_commit,
+    get_fast_tmpdir,
     make_test_git,
     make_test_hg,
 )
 
 
+# Hash the password only once for all the tests in this module.
+ERIC_PASSWORD_HASH = make_password('test', hasher='md5')
+
+
 # Avoid trying to save the commands via the API
-@mock.patch('readthedocs.doc_builder.environments.BuildCommand.save', mock.MagicMock())
+@mock.patch.object(BuildCommand, 'save', new=lambda self, api_client: None)
 class TestGitBackend(TestCase):
-    def setUp(self):
-        git_repo = make_test_git()
-        super().setUp()
-        self.eric = User(username='eric')
-        self.eric.set_password('test')
-        self.eric.save()
-        self.project = Project.objects.create(
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Creating the repository runs several git commands,
+        # so it's created once and each test works on a copy of it.
+        cls.git_repo = make_test_git()
+        # Copies of the repository have the same HEAD.
+        cls.git_commit = get_current_commit(cls.git_repo)
+        # Clone used by the tests that only need to checkout a branch.
+        cls.git_clone = clone_test_git(cls.git_repo)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.eric = User(username='eric')
+        cls.eric.password = ERIC_PASSWORD_HASH
+        cls.eric.save()
+        cls.project = Project.objects.create(
             name='Test Project',
             repo_type='git',
             #Our top-level checkout
-            repo=git_repo,
+            repo=cls.git_repo,
+        )
+        cls.project.users.add(cls.eric)
+
+    def setUp(self):
+        super().setUp()
+        # Tests create and delete branches and tags in the upstream repository.
+        self.project.repo = copy_test_repo(self.git_repo)
+        self.addCleanup(shutil.rmtree, os.path.dirname(self.project.repo))
+        # Each test clones the repository into its own directory,
+        # instead of sharing the checkout path of the project between tests.
+        # This way tests don't depend on each other and they can run in parallel.
+        checkout_path = patch.object(
+            Project,
+            'checkout_path',
+            return_value=self.make_local_repo_dir(),
         )
-        self.project.users.add(self.eric)
+        checkout_path.start()
+        self.addCleanup(checkout_path.stop)
         self.dummy_conf = Mock()
         # These are the default values from v1
         self.dummy_conf.submodules.include = ALL
         self.dummy_conf.submodules.exclude = []
         self.build_environment = LocalBuildEnvironment(api_client=mock.MagicMock())
 
+    def get_cloned_vcs_repo(self):
+        """
+        Return a backend with the repository already cloned.
+
+        The working directory is a copy of a clone shared by all tests,
+        so tests don't need to clone or fetch the repository with ``repo.update()``.
+        """
+        repo = self.project.vcs_repo(environment=self.build_environment)
+        repo.working_dir = copy_test_repo(self.git_clone)
+        self.addCleanup(shutil.rmtree, os.path.dirname(repo.working_dir))
+        return repo
+
+    def make_local_repo_dir(self):
+        """Create the directory where the repo is cloned, it's removed after the test."""
+        tmpdir = TemporaryDirectory(dir=get_fast_tmpdir())
+        self.addCleanup(tmpdir.cleanup)
+        local_repo = os.path.join(tmpdir.name, 'local')
+        os.mkdir(local_repo)
+        return local_repo
+
     def test_git_lsremote(self):
         repo_path = self.project.repo
         default_branches = [
@@ -63,18 +120,14 @@ class TestGitBackend(TestCase):
             'release/foo/bar',
             "with\xa0space",
         ]
-        for branch in branches:
-            create_git_branch(repo_path, branch)
-
-        create_git_tag(repo_path, 'v01')
+        create_git_refs(repo_path, branches=branches, tags=['v01', 'release-ünîø∂é'])
         create_git_tag(repo_path, 'v02', annotated=True)
-        create_git_tag(repo_path, 'release-ünîø∂é')
 
         repo = self.project.vcs_repo(environment=self.build_environment)
         # create the working dir if it not exists. It's required to ``cwd`` to
         # execute the command
         repo.check_working_dir()
-        commit = get_current_commit(repo_path)
+        commit = self.git_commit
         repo_branches, repo_tags = repo.lsremote()
 
         self.assertEqual(
@@ -89,15 +142,14 @@ class TestGitBackend(TestCase):
 
     def test_git_lsremote_tags_only(self):
         repo_path = self.project.repo
-        create_git_tag(repo_path, "v01")
+        create_git_refs(repo_path, tags=["v01", "release-ünîø∂é"])
         create_git_tag(repo_path, "v02", annotated=True)
-        create_git_tag(repo_path, "release-ünîø∂é")
 
         repo = self.project.vcs_repo(environment=self.build_environment)
         # create the working dir if it not exists. It's required to ``cwd`` to
         # execute the command
         repo.check_working_dir()
-        commit = get_current_commit(repo_path)
+        commit = self.git_commit
         repo_branches, repo_tags = repo.lsremote(
             include_tags=True, include_branches=False
         )
@@ -122,8 +174,7 @@ class TestGitBackend(TestCase):
             "release/2.0.0",
             "release/foo/bar",
         ]
-        for branch in branches:
-            create_git_branch(repo_path, branch)
+        create_git_refs(repo_path, branches=branches)
 
         repo = self.project.vcs_repo(environment=self.build_environment)
         # create the working dir if it not exists. It's required to ``cwd`` to
@@ -139,8 +190,7 @@ class TestGitBackend(TestCase):
             {branch.verbose_name: branch.identifier for branch in repo_branches},
         )
 
-    @patch('readthedocs.projects.models.Project.checkout_path')
-    def test_git_branches(self, checkout_path):
+    def test_git_branches(self):
         repo_path = self.project.repo
         default_branches = [
             # comes from ``make_test_git`` function
@@ -154,13 +204,7 @@ class TestGitBackend(TestCase):
             'release/2.0.0',
             'release/foo/bar',
         ]
-        for branch in branches:
-            create_git_branch(repo_path, branch)
-
-        # Create dir where to clone the repo
-        local_repo = os.path.join(mkdtemp(), 'local')
-        os.mkdir(local_repo)
-        checkout_path.return_value = local_repo
+        create_git_refs(repo_path, branches=branches)
 
         repo = self.project.vcs_repo(environment=self.build_environment)
         repo.clone()
@@ -170,8 +214,7 @@ class TestGitBackend(TestCase):
             {branch.verbose_name: branch.identifier for branch in repo.branches},
         )
 
-    @patch('readthedocs.projects.models.Project.checkout_path')
-    def test_git_branches_unicode(self, checkout_path):
+    def test_git_branches_unicode(self):
         repo_path = self.project.repo
         default_branches = [
             # comes from ``make_test_git`` function
@@ -182,13 +225,7 @@ class TestGitBackend(TestCase):
             'master',
             'release-ünîø∂é',
         ]
-        for branch in branches:
-            create_git_branch(repo_path, branch)
-
-        # Create dir where to clone the repo
-        local_repo = os.path.join(mkdtemp(), 'local')
-        os.mkdir(local_repo)
-        checkout_path.return_value = local_repo
+        create_git_refs(repo_path, branches=branches)
 
         repo = self.project.vcs_repo(environment=self.build_environment)
         repo.clone()
@@ -211,11 +248,12 @@ class TestGitBackend(TestCase):
 
     @patch('readthedocs.vcs_support.backends.git.Backend.fetch')
     def test_git_update_with_external_version(self, fetch):
-        version = fixture.get(
-            Version,
+        version = Version.objects.create(
             project=self.project,
             type=EXTERNAL,
-            active=True
+            active=True,
+            identifier='1',
+            verbose_name='1',
         )
         repo = self.project.vcs_repo(
             verbose_name=version.verbose_name,
@@ -226,11 +264,12 @@ class TestGitBackend(TestCase):
         fetch.assert_called_once()
 
     def test_git_fetch_with_external_version(self):
-        version = fixture.get(
-            Version,
+        version = Version.objects.create(
             project=self.project,
             type=EXTERNAL,
-            active=True
+            active=True,
+            identifier='1',
+            verbose_name='1',
         )
         repo = self.project.vcs_repo(
             verbose_name=version.verbose_name,
@@ -254,58 +293,45 @@ class TestGitBackend(TestCase):
 
     def test_git_tags(self):
         repo_path = self.project.repo
-        create_git_tag(repo_path, 'v01')
+        create_git_refs(repo_path, tags=['v01', 'release-ünîø∂é'])
         create_git_tag(repo_path, 'v02', annotated=True)
-        create_git_tag(repo_path, 'release-ünîø∂é')
         repo = self.project.vcs_repo(environment=self.build_environment)
         # We aren't cloning the repo,
         # so we need to hack the repo path
         repo.working_dir = repo_path
-        commit = get_current_commit(repo_path)
+        commit = self.git_commit
         self.assertEqual(
             {"v01": commit, "v02": commit, "release-ünîø∂é": commit},
             {tag.verbose_name: tag.identifier for tag in repo.tags},
         )
 
     def test_check_for_submodules(self):
-        repo = self.project.vcs_repo(environment=self.build_environment)
-
-        repo.update()
+        repo = self.get_cloned_vcs_repo()
         self.assertFalse(repo.are_submodules_available(self.dummy_conf))
 
         # The submodule branch contains one submodule
         repo.checkout('submodule')
         self.assertTrue(repo.are_submodules_available(self.dummy_conf))
 
-    def test_skip_submodule_checkout(self):
-        repo = self.project.vcs_repo(environment=self.build_environment)
-        repo.update()
-        repo.checkout('submodule')
-        self.assertTrue(repo.are_submodules_available(self.dummy_conf))
-
     def test_use_shallow_clone(self):
-        repo = self.project.vcs_repo(environment=self.build_environment)
-        repo.update()
+        repo = self.get_cloned_vcs_repo()
         repo.checkout('submodule')
         self.assertTrue(repo.use_shallow_clone())
-        fixture.get(
-            Feature,
-            projects=[self.project],
+        feature = Feature.objects.create(
             feature_id=Feature.DONT_SHALLOW_CLONE,
         )
+        feature.projects.add(self.project)
         self.assertTrue(self.project.has_feature(Feature.DONT_SHALLOW_CLONE))
         self.assertFalse(repo.use_shallow_clone())
 
     def test_check_submodule_urls(self):
-        repo = self.project.vcs_repo(environment=self.build_environment)
-        repo.update()
+        repo = self.get_cloned_vcs_repo()
         repo.checkout('submodule')
         valid, _ = repo.validate_submodules(self.dummy_conf)
         self.assertTrue(valid)
 
     def test_check_invalid_submodule_urls(self):
-        repo = self.project.vcs_repo(environment=self.build_environment)
-        repo.update()
+        repo = self.get_cloned_vcs_repo()
         repo.checkout('invalidsubmodule')
         with self.assertRaises(RepositoryError) as e:
             repo.update_submodules(self.dummy_conf)
@@ -317,8 +343,7 @@ class TestGitBackend(TestCase):
         )
 
     def test_invalid_submodule_is_ignored(self):
-        repo = self.project.vcs_repo(environment=self.build_environment)
-        repo.update()
+        repo = self.get_cloned_vcs_repo()
         repo.checkout('submodule')
         gitmodules_path = os.path.join(repo.working_dir, '.gitmodules')
 
@@ -334,22 +359,14 @@ class TestGitBackend(TestCase):
         self.assertTrue(valid)
         self.assertEqual(list(submodules), ['foobar'])
 
-    @patch('readthedocs.projects.models.Project.checkout_path')
-    def test_fetch_clean_tags_and_branches(self, checkout_path):
+    def test_fetch_clean_tags_and_branches(self):
         upstream_repo = self.project.repo
-        create_git_tag(upstream_repo, 'v01')
-        create_git_tag(upstream_repo, 'v02')
-        create_git_branch(upstream_repo, 'newbranch')
-
-        local_repo = os.path.join(mkdtemp(), 'local')
-        os.mkdir(local_repo)
-        checkout_path.return_value = local_repo
+        create_git_refs(upstream_repo, branches=['newbranch'], tags=['v01', 'v02'])
 
         repo = self.project.vcs_repo(environment=self.build_environment)
         repo.clone()
 
-        delete_git_tag(upstream_repo, 'v02')
-        delete_git_branch(upstream_repo, 'newbranch')
+        delete_git_refs(upstream_repo, branches=['newbranch'], tags=['v02'])
 
         # We still have all branches and tags in the local repo
         self.assertEqual(
@@ -379,38 +396,32 @@ class TestGitBackend(TestCase):
 
 
 # Avoid trying to save the commands via the API
-@mock.patch('readthedocs.doc_builder.environments.BuildCommand.save', mock.MagicMock())
+@mock.patch.object(BuildCommand, 'save', new=lambda self, api_client: None)
 class TestHgBackend(TestCase):
 
-    def setUp(self):
-        hg_repo = make_test_hg()
-        super().setUp()
-        self.eric = User(username='eric')
-        self.eric.set_password('test')
-        self.eric.save()
-        self.project = Project.objects.create(
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Tests don't modify the upstream repository,
+        # so it's created once for all tests.
+        cls.hg_repo = make_test_hg()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.eric = User(username='eric')
+        cls.eric.password = ERIC_PASSWORD_HASH
+        cls.eric.save()
+        cls.project = Project.objects.create(
             name='Test Project',
             repo_type='hg',
             # Our top-level checkout
-            repo=hg_repo,
+            repo=cls.hg_repo,
         )
-        self.project.users.add(self.eric)
-        self.build_environment = LocalBuildEnvironment(api_client=mock.MagicMock())
-
-    def test_parse_branches(self):
-        data = """\
-        stable
-        default
-        """
+        cls.project.users.add(cls.eric)
 
-        expected_ids = ["stable", "default"]
-        given_ids = [
-            x.identifier
-            for x in self.project.vcs_repo(
-                environment=self.build_environment
-            ).parse_branches(data)
-        ]
-        self.assertEqual(expected_ids, given_ids)
+    def setUp(self):
+        super().setUp()
+        self.build_environment = LocalBuildEnvironment(api_client=mock.MagicMock())
 
     def test_update_and_checkout(self):
         repo = self.project.vcs_repo(environment=self.build_environment)
@@ -432,6 +443,32 @@ class TestHgBackend(TestCase):
             RepositoryError.FAILED_TO_CHECKOUT.format(version),
         )
 
+
+class TestHgParse(SimpleTestCase):
+
+    """Tests for parsing the output of hg commands, they don't need a repository."""
+
+    def setUp(self):
+        project = Project(
+            name='Test Project',
+            repo_type='hg',
+            repo='https://example.com/repo',
+        )
+        self.repo = project.vcs_repo(environment=mock.MagicMock())
+
+    def test_parse_branches(self):
+        data = """\
+        stable
+        default
+        """
+
+        expected_ids = ["stable", "default"]
+        given_ids = [
+            x.identifier
+            for x in self.repo.parse_branches(data)
+        ]
+        self.assertEqual(expected_ids, given_ids)
+
     def test_parse_tags(self):
         data = """\
         tip                            13575:8e94a1b4e9a4
@@ -447,8 +484,6 @@ class TestHgBackend(TestCase):
 
         given_ids = [
             (x.identifier, x.verbose_name)
-            for x in self.project.vcs_repo(
-                environment=self.build_environment
-            ).parse_tags(data)
+            for x in self.repo.parse_tags(data)
         ]
         self.assertEqual(expected_tags, given_ids)
@@ -2,8 +2,8 @@
 
 import subprocess
 import textwrap
-from os import chdir, environ, mkdir
-from os.path import abspath
+from os import W_OK, access, chdir, devnull, environ, mkdir
+from os.path import abspath, basename, isdir
 from os.path import join as pjoin
 from shutil import copytree
 from tempfile import mkdtemp
@@ -38,12 +38,33 @@ def check_output(command, env=None):
     return output
 
 
+def get_git_env(directory):
+    """
+    Return the environment to run git commands over the repository at ``directory``.
+
+    Setting the repository and work tree explicitly saves git from discovering them,
+    and ignoring the global and system configuration avoids reading those files
+    on each call (and makes the commands independent of the user's configuration).
+
+    :param directory: The directory where the git repo is
+    """
+    env = environ.copy()
+    env.update({
+        'GIT_DIR': pjoin(directory, '.git'),
+        'GIT_WORK_TREE': directory,
+        'GIT_CONFIG_GLOBAL': devnull,
+        'GIT_CONFIG_NOSYSTEM': '1',
+        'GIT_OPTIONAL_LOCKS': '0',
+        'GIT_TERMINAL_PROMPT': '0',
+    })
+    return env
+
+
 @restoring_chdir
 def make_test_git():
     directory = mkdtemp()
     directory = make_git_repo(directory)
-    env = environ.copy()
-    env['GIT_DIR'] = pjoin(directory, '.git')
+    env = get_git_env(directory)
     chdir(directory)
 
     # Add fake repo as submodule. We need to fake this here because local path
@@ -69,6 +90,51 @@ def make_test_git():
     return directory
 
 
+def get_fast_tmpdir():
+    """
+    Return a directory for temporary files that lives in memory, if available.
+
+    Repositories are cloned and copied several times in tests,
+    using a memory backed directory (``/dev/shm``) avoids hitting the disk.
+    ``None`` is returned if it's not available,
+    so the default temporary directory is used.
+    """
+    path = '/dev/shm'
+    if isdir(path) and access(path, W_OK):
+        return path
+    return None
+
+
+def copy_test_repo(directory):
+    """
+    Copy a test repository into a new temporary directory.
+
+    This is cheaper than creating the repository again (e.g. with ``make_test_git``)
+    for each test that needs its own copy.
+
+    :param directory: The directory where the repo is
+    :returns: The directory of the copy
+    """
+    destination = pjoin(mkdtemp(dir=get_fast_tmpdir()), basename(directory))
+    copytree(directory, destination, symlinks=True)
+    return destination
+
+
+def clone_test_git(directory):
+    """
+    Clone a test git repository into a new temporary directory.
+
+    All branches of the repository are available as remote branches,
+    like in the clones done by the git backend.
+
+    :param directory: The directory where the git repo is
+    :returns: The directory of the clone
+    """
+    destination = pjoin(mkdtemp(dir=get_fast_tmpdir()), basename(directory))
+    check_output(['git', 'clone', '--no-single-branch', directory, destination])
+    return destination
+
+
 @restoring_chdir
 def add_git_submodule_without_cloning(directory, submodule, url):
     """
@@ -84,8 +150,7 @@ def add_git_submodule_without_cloning(directory, submodule, url):
     :param url: The url where the submodule points to
     :type url: str
     """
-    env = environ.copy()
-    env['GIT_DIR'] = pjoin(directory, '.git')
+    env = get_git_env(directory)
     chdir(directory)
 
     mkdir(pjoin(directory, submodule))
@@ -112,8 +177,7 @@ def make_git_repo(directory, name='sample_repo'):
     sample = abspath(pjoin(path, 'rtd_tests/fixtures/sample_repo'))
     directory = pjoin(directory, name)
     copytree(sample, directory)
-    env = environ.copy()
-    env['GIT_DIR'] = pjoin(directory, '.git')
+    env = get_git_env(directory)
     chdir(directory)
 
     # Initialize and configure
@@ -135,8 +199,7 @@ def make_git_repo(directory, name='sample_repo'):
 
 @restoring_chdir
 def create_git_tag(directory, tag, annotated=False):
-    env = environ.copy()
-    env['GIT_DIR'] = pjoin(directory, '.git')
+    env = get_git_env(directory)
     chdir(directory)
 
     command = ['git', 'tag']
@@ -148,8 +211,7 @@ def create_git_tag(directory, tag, annotated=False):
 
 @restoring_chdir
 def delete_git_tag(directory, tag):
-    env = environ.copy()
-    env['GIT_DIR'] = pjoin(directory, '.git')
+    env = get_git_env(directory)
     chdir(directory)
 
     command = ['git', 'tag', '--delete', tag]
@@ -158,18 +220,70 @@ def delete_git_tag(directory, tag):
 
 @restoring_chdir
 def create_git_branch(directory, branch):
-    env = environ.copy()
-    env['GIT_DIR'] = pjoin(directory, '.git')
+    env = get_git_env(directory)
     chdir(directory)
 
     command = ['git', 'branch', branch]
     check_output(command, env=env)
 
 
+@restoring_chdir
+def update_git_refs(directory, commands):
+    """
+    Run several ``git update-ref`` commands with a single git call.
+
+    :param directory: The directory where the git repo is
+    :param commands: Commands in the ``git update-ref --stdin`` format,
+        like ``update refs/heads/main HEAD`` or ``delete refs/tags/v1``
+    """
+    env = get_git_env(directory)
+    chdir(directory)
+
+    output = subprocess.run(
+        ['git', 'update-ref', '--stdin'],
+        input=''.join(f'{command}\n' for command in commands).encode(),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        env=env,
+        check=False,
+    ).stdout
+    log.info(output)
+    return output
+
+
+def create_git_refs(directory, branches=(), tags=()):
+    """
+    Create several branches and (lightweight) tags pointing to ``HEAD``.
+
+    All refs are created with a single git call,
+    instead of running one git command for each ref.
+    Existing refs are moved to ``HEAD``.
+
+    :param directory: The directory where the git repo is
+    :param branches: Names of the branches to create
+    :param tags: Names of the tags to create
+    """
+    commands = [f'update refs/heads/{branch} HEAD' for branch in branches]
+    commands.extend(f'update refs/tags/{tag} HEAD' for tag in tags)
+    return update_git_refs(directory, commands)
+
+
+def delete_git_refs(directory, branches=(), tags=()):
+    """
+    Delete several branches and tags with a single git call.
+
+    :param directory: The directory where the git repo is
+    :param branches: Names of the branches to delete
+    :param tags: Names of the tags to delete
+    """
+    commands = [f'delete refs/heads/{branch}' for branch in branches]
+    commands.extend(f'delete refs/tags/{tag}' for tag in tags)
+    return update_git_refs(directory, commands)
+
+
 @restoring_chdir
 def delete_git_branch(directory, branch):
-    env = environ.copy()
-    env['GIT_DIR'] = pjoin(directory, '.git')
+    env = get_git_env(directory)
     chdir(directory)
 
     command = ['git', 'branch', '-D', branch]
@@ -181,8 +295,7 @@ def create_git_submodule(
     directory, submodule,
     msg='Add realative submodule', branch='master',
 ):
-    env = environ.copy()
-    env['GIT_DIR'] = pjoin(directory, '.git')
+    env = get_git_env(directory)
     chdir(directory)
 
     command = ['git', 'branch', '-D', branch]
@@ -195,8 +308,7 @@ def create_git_submodule(
 
 @restoring_chdir
 def get_current_commit(directory):
-    env = environ.copy()
-    env["GIT_DIR"] = pjoin(directory, ".git")
+    env = get_git_env(directory)
     chdir(directory)
 
     command = ["git", "rev-parse", "HEAD"]
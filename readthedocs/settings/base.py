@@ -2,8 +2,9 @@
 
 import os
 import re
-import subprocess
 import socket
+from functools import cached_property
+from importlib.util import find_spec
 
 import structlog
 
@@ -14,17 +15,11 @@ from corsheaders.defaults import default_headers
 from readthedocs.core.settings import Settings
 
 
-try:
-    import readthedocsext  # noqa
-    ext = True
-except ImportError:
-    ext = False
-
-try:
-    import readthedocsext.theme  # noqa
-    ext_theme = True
-except ImportError:
-    ext_theme = False
+# Check if the extensions are installed.
+# Resolving ``readthedocsext.theme`` imports the parent ``readthedocsext`` package,
+# but not the theme module itself, that's imported only when its templates are needed.
+ext = find_spec('readthedocsext') is not None
+ext_theme = ext and find_spec('readthedocsext.theme') is not None
 
 
 _ = gettext = lambda s: s
@@ -49,7 +44,7 @@ class CommunityBaseSettings(Settings):
     DEBUG = True
     RTD_FORCE_SHOW_DEBUG_TOOLBAR = False
 
-    @property
+    @cached_property
     def DEBUG_TOOLBAR_CONFIG(self):
         def _show_debug_toolbar(request):
             return request.environ.get('SERVER_NAME', None) != 'testserver' and self.SHOW_DEBUG_TOOLBAR
@@ -58,7 +53,7 @@ class CommunityBaseSettings(Settings):
             'SHOW_TOOLBAR_CALLBACK': _show_debug_toolbar,
         }
 
-    @property
+    @cached_property
     def SHOW_DEBUG_TOOLBAR(self):
         """
         Show django-debug-toolbar on DEBUG or if it's forced by RTD_FORCE_SHOW_DEBUG_TOOLBAR.
@@ -101,7 +96,7 @@ class CommunityBaseSettings(Settings):
     SESSION_COOKIE_AGE = 30 * 24 * 60 * 60  # 30 days
     SESSION_SAVE_EVERY_REQUEST = False
 
-    @property
+    @cached_property
     def SESSION_COOKIE_SAMESITE(self):
         """
         Cookie used in cross-origin API requests from *.rtd.io to rtd.org/api/v2/sustainability/.
@@ -153,11 +148,13 @@ class CommunityBaseSettings(Settings):
 
     # Keep BuildData models on database during this time
     RTD_TELEMETRY_DATA_RETENTION_DAYS = 30 * 6  # 180 days / 6 months
+    # Number of BuildData models deleted per query
+    RTD_TELEMETRY_DATA_DELETE_CHUNK_SIZE = 5000
 
     # Number of days an invitation is valid.
     RTD_INVITATIONS_EXPIRATION_DAYS = 15
 
-    @property
+    @cached_property
     def RTD_DEFAULT_FEATURES(self):
         # Features listed here will be available to users that don't have a
         # subscription or if their subscription doesn't include the feature.
@@ -189,14 +186,14 @@ class CommunityBaseSettings(Settings):
 
     DOC_PATH_PREFIX = '_/'
 
-    @property
+    @cached_property
     def RTD_EXT_THEME_ENABLED(self):
         return ext_theme and 'RTD_EXT_THEME_ENABLED' in os.environ
 
     RTD_EXT_THEME_DEV_SERVER = None
 
     # Application classes
-    @property
+    @cached_property
     def INSTALLED_APPS(self):  # noqa
         apps = [
             'django.contrib.auth',
@@ -277,23 +274,23 @@ class CommunityBaseSettings(Settings):
 
         return apps
 
-    @property
+    @cached_property
     def CRISPY_TEMPLATE_PACK(self):
         if self.RTD_EXT_THEME_ENABLED:
             return 'semantic-ui'
         return 'bootstrap'
 
-    @property
+    @cached_property
     def CRISPY_ALLOWED_TEMPLATE_PACKS(self):
         if self.RTD_EXT_THEME_ENABLED:
             return ('semantic-ui',)
         return ("bootstrap", "uni_form", "bootstrap3", "bootstrap4")
 
-    @property
+    @cached_property
     def USE_PROMOS(self):  # noqa
         return 'readthedocsext.donate' in self.INSTALLED_APPS
 
-    @property
+    @cached_property
     def MIDDLEWARE(self):
         middlewares = [
             'readthedocs.core.middleware.NullCharactersMiddleware',
@@ -385,10 +382,11 @@ class CommunityBaseSettings(Settings):
     RTD_BUILD_COMMANDS_STORAGE = 'readthedocs.builds.storage.BuildMediaFileSystemStorage'
     RTD_STATICFILES_STORAGE = 'readthedocs.builds.storage.StaticFilesStorage'
 
-    @property
+    @cached_property
     def TEMPLATES(self):
         dirs = [self.TEMPLATE_ROOT]
         if self.RTD_EXT_THEME_ENABLED:
+            import readthedocsext.theme
             dirs.insert(0, os.path.join(
                 os.path.dirname(readthedocsext.theme.__file__),
                 'templates',
@@ -680,21 +678,23 @@ class CommunityBaseSettings(Settings):
 
     def _get_docker_memory_limit(self):
         try:
-            total_memory = int(subprocess.check_output(
-                "free -m | awk '/^Mem:/{print $2}'",
-                shell=True,
-            ))
+            # Total memory in MiB, same as the output of ``free -m``,
+            # without spawning a shell.
+            total_memory = (
+                os.sysconf('SC_PHYS_PAGES') * os.sysconf('SC_PAGE_SIZE') // (1024 * 1024)
+            )
             return total_memory, round(total_memory - 1000, -2)
-        except ValueError:
-            # On systems without a `free` command it will return a string to
-            # int and raise a ValueError
+        except (AttributeError, ValueError, OSError):
+            # ``os.sysconf`` isn't available on all systems (AttributeError),
+            # and not all systems support these names (ValueError).
             log.exception('Failed to get memory size, using defaults Docker limits.')
+            return None, None
 
     # Coefficient used to determine build time limit, as a percentage of total
     # memory. Historical values here were 0.225 to 0.3.
     DOCKER_TIME_LIMIT_COEFF = 0.25
 
-    @property
+    @cached_property
     def DOCKER_LIMITS(self):
         """
         Set docker limits dynamically, if in production, based on system memory.
@@ -747,19 +747,19 @@ class CommunityBaseSettings(Settings):
     SOCIALACCOUNT_PROVIDERS = {
         'github': {
             "VERIFIED_EMAIL": True,
-            'SCOPE': [
+            'SCOPE': (
                 'user:email',
                 'read:org',
                 'admin:repo_hook',
                 'repo:status',
-            ],
+            ),
         },
         'gitlab': {
             "VERIFIED_EMAIL": True,
-            'SCOPE': [
+            'SCOPE': (
                 'api',
                 'read_user',
-            ],
+            ),
         },
         # Bitbucket scope/permissions are determined by the Oauth consumer setup on bitbucket.org
     }
@@ -781,15 +781,16 @@ class CommunityBaseSettings(Settings):
     # since that will set the `Access-Control-Allow-Origin` header to `*`,
     # we won't be able to pass credentials fo the sustainability API with that value.
     CORS_ALLOWED_ORIGIN_REGEXES = [re.compile(".+")]
-    CORS_ALLOW_HEADERS = list(default_headers) + [
+    CORS_ALLOW_HEADERS = (
+        *default_headers,
         'x-hoverxref-version',
-    ]
+    )
     # Additional protection to allow only idempotent methods.
-    CORS_ALLOW_METHODS = [
+    CORS_ALLOW_METHODS = (
         'GET',
         'OPTIONS',
         'HEAD',
-    ]
+    )
 
     # URLs to allow CORS to read from unauthed.
     CORS_URLS_REGEX = re.compile(
@@ -821,7 +822,9 @@ class CommunityBaseSettings(Settings):
     ES_HOSTS = ['search:9200']
     ELASTICSEARCH_DSL = {
         'default': {
-            'hosts': 'search:9200'
+            'hosts': 'search:9200',
+            # Compress the (bulk) requests and accept compressed responses.
+            'http_compress': True,
         },
     }
     # Chunk size for elasticsearch reindex celery tasks
@@ -947,6 +950,13 @@ class CommunityBaseSettings(Settings):
 
     # Logging
     LOG_FORMAT = '%(name)s:%(lineno)s[%(process)d]: %(levelname)s %(message)s'
+    # Level of our loggers, records below this level are discarded
+    # before running any of the structlog processors.
+    # Set it to ``INFO`` in production, debug records are only useful locally.
+    RTD_LOGGING_LEVEL = os.environ.get('RTD_LOGGING_LEVEL', 'DEBUG')
+    # Render the console and debug.log records as JSON,
+    # it's cheaper than the console renderers (useful for production).
+    RTD_LOGGING_JSON = 'RTD_LOGGING_JSON' in os.environ
     LOGGING = {
         'version': 1,
         'disable_existing_loggers': True,
@@ -987,18 +997,34 @@ class CommunityBaseSettings(Settings):
                 # See https://www.structlog.org/en/stable/standard-library.html#rendering-using-structlog-based-formatters-within-logging
                 "foreign_pre_chain": shared_processors,
             },
+            # Used by the console and debug handlers when ``RTD_LOGGING_JSON`` is set.
+            "json": {
+                "()": structlog.stdlib.ProcessorFormatter,
+                "processors": [
+                    structlog.processors.TimeStamper(fmt='iso'),
+                    structlog.stdlib.ProcessorFormatter.remove_processors_meta,
+                    structlog.processors.JSONRenderer(),
+                ],
+                # Allows to add extra data to log entries generated via ``logging`` module
+                # See https://www.structlog.org/en/stable/standard-library.html#rendering-using-structlog-based-formatters-within-logging
+                "foreign_pre_chain": shared_processors,
+            },
         },
         'handlers': {
             'console': {
                 'level': 'INFO',
                 'class': 'logging.StreamHandler',
-                'formatter': 'plain_console',
+                'formatter': 'json' if RTD_LOGGING_JSON else 'plain_console',
             },
             'debug': {
                 'level': 'DEBUG',
-                'class': 'logging.handlers.RotatingFileHandler',
+                # The file isn't rotated by us, rotate it externally (e.g. logrotate).
+                # ``WatchedFileHandler`` reopens the file after it's rotated,
+                # at the cost of a ``stat`` call per record
+                # (keep ``RTD_LOGGING_LEVEL`` above ``DEBUG`` in production).
+                'class': 'logging.handlers.WatchedFileHandler',
                 'filename': os.path.join(LOGS_ROOT, 'debug.log'),
-                'formatter': 'key_value',
+                'formatter': 'json' if RTD_LOGGING_JSON else 'key_value',
             },
             'null': {
                 'class': 'logging.NullHandler',
@@ -1022,7 +1048,7 @@ class CommunityBaseSettings(Settings):
             },
             'readthedocs': {
                 'handlers': ['debug', 'console'],
-                'level': 'DEBUG',
+                'level': RTD_LOGGING_LEVEL,
                 # Don't double log at the root logger for these.
                 'propagate': False,
             },
@@ -1060,6 +1086,11 @@ class CommunityBaseSettings(Settings):
     CACHEOPS_ENABLED = False
     CACHEOPS_TIMEOUT = 60 * 60  # seconds
     CACHEOPS_OPS = {'get', 'fetch'}
+    # Feature flags and plan features are read on most requests,
+    # but they are rarely changed (only from the admin),
+    # so they can be cached for longer.
+    # Features are checked with ``.exists()`` (``Project.has_feature``).
+    CACHEOPS_STATIC_TIMEOUT = 24 * 60 * 60  # seconds
     CACHEOPS_DEGRADE_ON_FAILURE = True
     CACHEOPS = {
         # readthedocs.projects.*
@@ -1068,8 +1099,8 @@ class CommunityBaseSettings(Settings):
             'timeout': CACHEOPS_TIMEOUT,
         },
         'projects.feature': {
-            'ops': CACHEOPS_OPS,
-            'timeout': CACHEOPS_TIMEOUT,
+            'ops': CACHEOPS_OPS | {'exists'},
+            'timeout': CACHEOPS_STATIC_TIMEOUT,
         },
         'projects.projectrelationship': {
             'ops': CACHEOPS_OPS,
@@ -1095,6 +1126,6 @@ class CommunityBaseSettings(Settings):
         # readthedocs.subscriptions.*
         'subscriptions.planfeature': {
             'ops': CACHEOPS_OPS,
-            'timeout': CACHEOPS_TIMEOUT,
+            'timeout': CACHEOPS_STATIC_TIMEOUT,
         },
     }
@@ -17,6 +17,9 @@ class CommunityTestSettings(CommunityBaseSettings):
 
     # Disable password validators on tests
     AUTH_PASSWORD_VALIDATORS = []
+    # Hashing passwords with the default hasher is slow on purpose,
+    # lots of tests create users with a password.
+    PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
 
     DEBUG = False
     TEMPLATE_DEBUG = False
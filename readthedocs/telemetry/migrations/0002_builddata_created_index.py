@@ -0,0 +1,51 @@
+from django.db import migrations, models
+
+from readthedocs.core.utils.migrations import RunSQLPostgres
+
+
+class Migration(migrations.Migration):
+
+    """
+    Index ``BuildData.created``.
+
+    Old models are deleted daily by date,
+    the index is created concurrently, so writes to the table aren't blocked.
+    """
+
+    # CREATE INDEX CONCURRENTLY can't be run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ("telemetry", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(
+                    model_name="builddata",
+                    index=models.Index(
+                        fields=["created"], name="telemetry_created_idx"
+                    ),
+                ),
+            ],
+            database_operations=[
+                RunSQLPostgres(
+                    sql=[
+                        "CREATE INDEX CONCURRENTLY IF NOT EXISTS telemetry_created_idx ON telemetry_builddata (created);",
+                    ],
+                    reverse_sql=[
+                        "DROP INDEX CONCURRENTLY IF EXISTS telemetry_created_idx;",
+                    ],
+                    fallback=[
+                        migrations.AddIndex(
+                            model_name="builddata",
+                            index=models.Index(
+                                fields=["created"], name="telemetry_created_idx"
+                            ),
+                        ),
+                    ],
+                ),
+            ],
+        ),
+    ]
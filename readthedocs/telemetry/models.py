@@ -111,6 +111,10 @@ class BuildDataManager(models.Manager):
 class BuildData(TimeStampedModel):
     class Meta:
         verbose_name_plural = "Build data"
+        indexes = [
+            # Old models are deleted by date daily.
+            models.Index(fields=["created"], name="telemetry_created_idx"),
+        ]
 
     data = models.JSONField()
     objects = BuildDataManager()
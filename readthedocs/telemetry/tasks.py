@@ -1,5 +1,6 @@
 """Tasks related to telemetry."""
 
+import structlog
 from django.conf import settings
 from django.utils import timezone
 
@@ -7,6 +8,8 @@ from readthedocs.builds.models import Build
 from readthedocs.telemetry.models import BuildData
 from readthedocs.worker import app
 
+log = structlog.get_logger(__name__)
+
 
 @app.task(queue="web")
 def save_build_data(build_id, data):
@@ -16,7 +19,12 @@ def save_build_data(build_id, data):
     Mainly used from the builders,
     since they don't have access to the database.
     """
-    build = Build.objects.filter(id=build_id).first()
+    # ``collect`` reads the project and version of the build.
+    build = (
+        Build.objects.filter(id=build_id)
+        .select_related("project", "version")
+        .first()
+    )
     if build:
         BuildData.objects.collect(build, data)
 
@@ -32,8 +40,20 @@ def delete_old_build_data():
           more (eg. active projects )and remove data we don't (eg. builds from spam projects)
     """
     retention_days = settings.RTD_TELEMETRY_DATA_RETENTION_DAYS
+    chunk_size = settings.RTD_TELEMETRY_DATA_DELETE_CHUNK_SIZE
     days_ago = timezone.now().date() - timezone.timedelta(days=retention_days)
-    return BuildData.objects.filter(
-        created__lt=days_ago,
-        created__gt=days_ago - timezone.timedelta(days=90),
-    ).delete()
+    # The oldest models are deleted first, walking the index over ``created``.
+    queryset = BuildData.objects.filter(created__lt=days_ago).order_by("created")
+    # Delete in chunks, so each ``DELETE`` is its own (short) transaction
+    # instead of locking all the old rows at once.
+    # BuildData doesn't have relations or signals,
+    # so Django deletes the rows without fetching them.
+    deleted = 0
+    while True:
+        ids = list(queryset.values_list("pk", flat=True)[:chunk_size])
+        if not ids:
+            break
+        count, _ = BuildData.objects.filter(pk__in=ids).delete()
+        deleted += count
+    log.info("Deleted old build data.", count=deleted)
+    return deleted
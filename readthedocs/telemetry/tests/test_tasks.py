@@ -0,0 +1,45 @@
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from readthedocs.telemetry.models import BuildData
+from readthedocs.telemetry.tasks import delete_old_build_data
+
+
+@override_settings(
+    RTD_TELEMETRY_DATA_RETENTION_DAYS=30,
+    RTD_TELEMETRY_DATA_DELETE_CHUNK_SIZE=2,
+)
+class TestTelemetryTasks(TestCase):
+    # BuildData models are stored in the telemetry database.
+    databases = {"default", "telemetry"}
+
+    def _create_build_data(self, created):
+        build_data = BuildData.objects.create(data={})
+        BuildData.objects.filter(pk=build_data.pk).update(created=created)
+        return build_data
+
+    @mock.patch("django.utils.timezone.now")
+    def test_delete_old_build_data(self, now_mock):
+        now_mock.return_value = timezone.datetime(
+            year=2022,
+            month=6,
+            day=1,
+            tzinfo=timezone.utc,
+        )
+        new_date = timezone.datetime(year=2022, month=5, day=20, tzinfo=timezone.utc)
+        old_date = timezone.datetime(year=2022, month=4, day=1, tzinfo=timezone.utc)
+        very_old_date = timezone.datetime(year=2021, month=1, day=1, tzinfo=timezone.utc)
+        new = [self._create_build_data(new_date) for _ in range(2)]
+        for _ in range(4):
+            self._create_build_data(old_date)
+        self._create_build_data(very_old_date)
+
+        deleted = delete_old_build_data()
+
+        self.assertEqual(deleted, 5)
+        self.assertEqual(
+            set(BuildData.objects.values_list("pk", flat=True)),
+            {build_data.pk for build_data in new},
+        )
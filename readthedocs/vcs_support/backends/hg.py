@@ -1,8 +1,17 @@
 
 """Mercurial-related utilities."""
+import re
+
 from readthedocs.projects.exceptions import RepositoryError
 from readthedocs.vcs_support.base import BaseVCS, VCSVersion
 
+# A line of the output of `hg tags`, the tag name can contain spaces.
+# The changeset (`revision:hash`) is the last value of the line.
+TAG_LINE_RE = re.compile(
+    r'^[^\S\n]*(?P<name>\S.*?)[^\S\n]+\d+:(?P<commit_hash>\S+)[^\S\n]*$',
+    re.MULTILINE,
+)
+
 
 class Backend(BaseVCS):
 
@@ -99,20 +108,11 @@ class Backend(BaseVCS):
         Into VCSVersion objects with the tag name as verbose_name and the
         commit hash as identifier.
         """
-        vcs_tags = []
-        tag_lines = [line.strip() for line in data.splitlines()]
-        # starting from the rhs of each line, split a single value (changeset)
-        # off at whitespace; the tag name is the string to the left of that
-        tag_pairs = [line.rsplit(None, 1) for line in tag_lines]
-        for row in tag_pairs:
-            if len(row) != 2:
-                continue
-            name, commit = row
-            if name == 'tip':
-                continue
-            _, commit_hash = commit.split(':')
-            vcs_tags.append(VCSVersion(self, commit_hash, name))
-        return vcs_tags
+        return [
+            VCSVersion(self, match['commit_hash'], match['name'])
+            for match in TAG_LINE_RE.finditer(data)
+            if match['name'] != 'tip'
+        ]
 
     @property
     def commit(self):
@@ -75,8 +75,7 @@ class BaseVCS:
         self.environment = environment
 
     def check_working_dir(self):
-        if not os.path.exists(self.working_dir):
-            os.makedirs(self.working_dir)
+        os.makedirs(self.working_dir, exist_ok=True)
 
     def make_clean_working_dir(self):
         """Ensures that the working dir exists and is empty."""